@@ -79,8 +79,8 @@ export const uiHandlers = (() => {
         if (typeof _lastSnapshots !== 'undefined') {
             const colors = ["#E63946","#457B9D","#2A9D8F","#F4A261","#6A4C93"];
             _lastSnapshots.forEach((snap, idx) => {
-                const cid = `C${idx}`;
-                if (!snap.route_map_ID || !_visibleRoutes[cid]) return;
+                const cid = snap.carrier_id || `C${idx}`;
+                if (!snap.route_map_ID || _visibleRoutes[cid] === false) return;   // unlisted carriers are shown
                 const wh = {x: snap.warehouse_location[0], y: snap.warehouse_location[1]};
                 snap.route_map_ID.forEach(routeID =>
                     mapRenderer.drawRoute(
@@ -126,12 +126,6 @@ export const uiHandlers = (() => {
                 },
                 body: JSON.stringify(requestData)
             });
-            if (result && result.route_map_ID) {
-                _lastSimRoute = result;        // cache for persistence
-                drawEverything();
-            } else { alert('No result for the route'); }
-
-
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
@@ -160,15 +154,14 @@ export const uiHandlers = (() => {
             return;
         }
 
-        // 2. poll for live snapshots every 2 s
+        // 2. follow live snapshots of our run: pushed over SSE, else polled with an ETag
+        const jobQuery = startJson.job_id ? `?job=${startJson.job_id}` : '';
         const strokeColors = ["#E63946", "#457B9D", "#2A9D8F"];
-        const pollId = setInterval(async () => {
-            const r = await fetch('http://localhost:8001/api/carrier_routes')
-                            .then(res => res.json());
-            _lastSnapshots = r.snapshots;
+        function renderSnapshots(snapshots) {
+            _lastSnapshots = snapshots;
             // redraw map
             drawEverything();
-            r.snapshots.forEach((snap, idx) => {
+            snapshots.forEach((snap, idx) => {
                 if (!snap.route_map_ID) return;
                 const warehouse = {x: snap.warehouse_location[0],
                                 y: snap.warehouse_location[1]};
@@ -182,19 +175,43 @@ export const uiHandlers = (() => {
                     );
                 });
             });
+        }
 
-            // 3. stop when finished
-            if (r.finished && !r.running) {
-                clearInterval(pollId);
-                let lines = [`Initial total: ${r.profit_before_total+" €"}`,
-                `Final total:   ${r.profit_after_total+" €"}`,
-                    '-------------'];
-                Object.keys(r.profit_before).forEach(cid => {
-                    lines.push(`${cid}: ${r.profit_before[cid]+" €"}  →  ${r.profit_after[cid]+" €"}`);
-                });
-                alert(lines.join('\n'));
-            }
+        // 3. stop when finished
+        function isFinished(r) {
+            if (!(r.finished && !r.running)) return false;
+            let lines = [`Initial total: ${r.profit_before_total+" €"}`,
+            `Final total:   ${r.profit_after_total+" €"}`,
+                '-------------'];
+            Object.keys(r.profit_before).forEach(cid => {
+                lines.push(`${cid}: ${r.profit_before[cid]+" €"}  →  ${r.profit_after[cid]+" €"}`);
+            });
+            alert(lines.join('\n'));
+            return true;
+        }
 
+        if (typeof EventSource !== 'undefined') {
+            const byCarrier = {};      // carrier ID -> latest snapshot, in run order
+            const source = new EventSource(`http://localhost:8001/api/carrier_routes/stream${jobQuery}`);
+            source.addEventListener('routes', ev => {
+                const r = JSON.parse(ev.data);
+                if (r.full) Object.keys(byCarrier).forEach(cid => delete byCarrier[cid]);
+                Object.assign(byCarrier, r.carriers);
+                renderSnapshots(Object.values(byCarrier));
+                if (isFinished(r.meta)) source.close();
+            });
+            return;
+        }
+
+        let etag = null;
+        const pollId = setInterval(async () => {
+            const res = await fetch(`http://localhost:8001/api/carrier_routes${jobQuery}`,
+                                    {headers: etag ? {'If-None-Match': etag} : {}});
+            if (res.status === 304) return;    // nothing changed
+            etag = res.headers.get('ETag');
+            const r = await res.json();
+            renderSnapshots(r.snapshots);
+            if (isFinished(r)) clearInterval(pollId);
         }, 2000);
     }
 
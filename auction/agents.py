@@ -4,7 +4,6 @@ Mesa agents for the Collaborative Carrier Network
 """
 
 # stdlib
-import csv
 import sys
 import os
 from typing import Dict, List, Optional
@@ -15,20 +14,82 @@ from mesa import Agent
 
 # project
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from models.pickupDelivery import solve_PnD_problem
-from models.costModelBasedOnOrder import CostModel
+from models import metrics
+from models.costModelBasedOnOrder import PATH_CARRIERS_INFO, CostModel
+from models.orderBook import Order, OrderBook
+from models.pickupDelivery import InfeasibleRouteError
+from models.solverConfig import SolverConfig
 
-# FastAPI auctioneer
-AUCTIONEER_URL = "http://localhost:8000"
+# auctioneer transports
+from auction.network.auctioneer_client import MAX_POOL_SIZE, AuctioneerClient
+from auction.network.vickrey import VickreyAuctioneer
+
+
+# ──────────────────────────────────────────────────────────────────────
+# Auctioneer transports – "http" talks to the FastAPI service,
+# "inprocess" calls the same Vickrey logic without sockets
+# ──────────────────────────────────────────────────────────────────────
+class InProcessTransport:
+    """Same interface as AuctioneerClient, backed by a local VickreyAuctioneer."""
+
+    def __init__(self, auctioneer: Optional[VickreyAuctioneer] = None):
+        self.auctioneer = auctioneer or VickreyAuctioneer()
+
+    def start_auction(self, payload: Dict) -> Dict:
+        return self.auctioneer.start_auction(payload)
+
+    def next_request(self) -> Dict:
+        return self.auctioneer.next_request()
+
+    def open_auctions(self) -> List[Dict]:
+        return self.auctioneer.open_auctions()
+
+    def bid(self, payload: Dict) -> None:
+        self.auctioneer.place_bid(payload)
+
+    def bundle_bid(self, payload: Dict) -> None:
+        self.auctioneer.place_bundle_bid(payload)
+
+    def flush_bids(self) -> List[Dict]:
+        return []
+
+    def close_auction(self) -> Dict:
+        return self.auctioneer.close_auction()
+
+    def close_auctions(self) -> List[Dict]:
+        return self.auctioneer.close_auctions()
+
+    def new_tick(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+TRANSPORTS = ("http", "inprocess")
+
+
+def make_transport(kind: str = "http", n_carriers: int = 1):
+    if kind == "http":
+        return AuctioneerClient(pool_size=min(max(n_carriers, 1), MAX_POOL_SIZE))
+    if kind == "inprocess":
+        return InProcessTransport()
+    raise ValueError(f"unknown auctioneer transport: {kind}")
 
 
 # ──────────────────────────────────────────────────────────────────────
 # CarrierAgent
 # ──────────────────────────────────────────────────────────────────────
 class CarrierAgent(Agent):
-    """A carrier that sells its worst order and (later) bids for others."""
+    """
+    A carrier that sells its worst order and (later) bids for others.
+    With auction_mode="bundle" it offers its bundle_size worst orders in
+    one bundle auction and bids on combinations of the offered orders.
+    """
 
-    CYCLE_LENGTH = 5  # 0 = apply; 1 = offer; 2-4 = bid
+    CYCLE_LENGTH = 5  # 0 = apply; 1 = offer; 2-4 = bid, closed at the end
+    BUNDLE_SIZE  = 3  # orders per offered bundle
+    MAX_BUNDLE   = 3  # orders per bundle we bid on
 
     # ── init ───────────────────────────────────────────────────────────
     def __init__(
@@ -42,7 +103,13 @@ class CarrierAgent(Agent):
         a2: float,
         b1: float,
         b2: float,
-        depot_coord: tuple[float, float]
+        depot_coord: tuple[float, float],
+        solver_config: Optional[SolverConfig] = None,
+        auction_mode: str = "single",
+        carriers_dir: str = PATH_CARRIERS_INFO,
+        order_books: Optional[Dict[str, OrderBook]] = None,
+        depot_id: Optional[str] = None,
+        node_file: str = "nodeInfoFromGUI.csv"
     ):
         #super().__init__()
         self.unique_id = unique_id
@@ -52,68 +119,107 @@ class CarrierAgent(Agent):
         self.order_csv = order_csv
         self.travel_csv = travel_csv
         self.depot_coord = {"x": depot_coord[0], "y": depot_coord[1]}
-        self.depot_id = f"W{unique_id}"      # or "N9{unique_id}"
-        self._already_bid_req: Optional[str] = None
-        self.cost_model = CostModel(a1, a2, b1, b2, order_csv, travel_csv)
+        self.depot_id = depot_id or f"W{unique_id}"      # a node of node_file
+        if auction_mode not in ("single", "bundle"):
+            raise ValueError(f"unknown auction mode: {auction_mode}")
+        self.auction_mode = auction_mode
+        self._already_bid_reqs: set[str] = set()
+        # open single-order auctions we bid on: req_id -> (seller, pickup, delivery)
+        self._pending_bids: Dict[str, tuple] = {}
+        # our orders live in memory; order_books lets bidders look up ours
+        self.order_book = OrderBook.load(os.path.join(carriers_dir, order_csv))
+        if order_books is not None:
+            order_books[carrier_id] = self.order_book
+        self.cost_model = CostModel(a1, a2, b1, b2, order_csv, travel_csv,
+                                    solver_config=solver_config, carriers_dir=carriers_dir,
+                                    order_book=self.order_book, order_books=order_books,
+                                    depot_id=self.depot_id, node_file=node_file)
         self.offers_made   = 0      # total offers so far
         self.OFFERS_LIMIT  = 3      # limit offers
 
 
         # bookkeeping
-        self._cycle_pos = 0
         self._auction_req_id: Optional[str] = None   # request we are selling
-        self._auction_order_row: Optional[int] = None  # row index in CSV
+        self._auction_order_pk: Optional[str] = None   # order we are selling
 
     # ── helpers ────────────────────────────────────────────────────────
     @property
-    def _orders(self) -> List[List[str]]:
-        """Return current order rows [Order ID(pk), pickup, delivery]."""
-        with open(self.cost_model.path_order) as f:
-            return list(csv.reader(f))[1:]          # skip header
+    def _orders(self) -> List[Order]:
+        """Return current order rows (Order ID(pk), pickup, delivery)."""
+        return self.order_book.rows()
 
-    def _write_orders(self, rows: List[List[str]]) -> None:
-        with open(self.cost_model.path_order, "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow(["Order ID(pk)","pickup","delivery"])
-            w.writerows(rows)
+    def save_orders(self) -> None:
+        """Write the order book back to its CSV if it changed."""
+        if self.order_book.dirty:
+            self.order_book.save()
 
     # route distance (for GUI, not strictly needed here)
     def route_distance(self) -> float:
-        return sum(solve_PnD_problem(self.cost_model.path_order, self.cost_model.path_travel_matrix, 
-                                     depot_id=self.depot_id)["distance"])
+        return sum(self.cost_model.solution["distance"])
 
-    # ── Mesa step ──────────────────────────────────────────────────────
+    # ── auction clock events (auction.clock) ───────────────────────────
     def step(self) -> None:
-        # phase 0 – apply result from last auction
-        if self._cycle_pos == 0 and self.model.last_auction_result:
-            self._apply_result(self.model.last_auction_result)
+        """Nothing to do per tick; the model calls the on_* handlers when due."""
 
-        # phase 1 – start our own auction (worst order)
-        if self._cycle_pos == 1:
-            self._offer_worst_order()
+    @metrics.timed("agent.results")
+    def on_results(self, results: List[Dict]) -> List[tuple]:
+        """
+        Phase 0 – apply results from the auctions closed last cycle. If no
+        route serves the bought orders, they are dropped again and returned
+        as (seller ID, order) for the model to hand back (CarrierModel._after_results).
+        """
+        ours = [res for res in results
+                if self.carrier_id in (res["seller_id"], res.get("winner_id", res.get("winner")))]
+        changed = [self._apply_result(res) for res in ours]
+        metrics.count("agent.orders_changed", sum(changed))
+        if not any(changed):
+            return []
+        try:
+            self.cost_model.invalidate()
+            return []
+        except InfeasibleRouteError:
+            bought = [res for res in ours if res.get("winner_id", res.get("winner")) == self.carrier_id
+                      and res["seller_id"] != self.carrier_id and res["order_pk"] in self.order_book]
+            print(f"[{self.carrier_id}] ROLLBACK {[res['order_pk'] for res in bought]}: no feasible route")
+            returned = [(res["seller_id"], self.order_book.remove(res["order_pk"])) for res in bought]
+            metrics.count("agent.trades_rolled_back", len(returned))
+            self.cost_model.invalidate()
+            return returned
+
+    @metrics.timed("agent.offer")
+    def on_offer(self) -> bool:
+        # phase 1 – start our own auction (worst order / orders)
+        if self.auction_mode == "bundle":
+            return self._offer_worst_bundle()
+        return self._offer_worst_order()
 
-        # phase 2-4 – bid on others 
-        if self._cycle_pos in (2, 3, 4):
-            self._maybe_bid()
+    @metrics.timed("agent.bid")
+    def on_bid(self) -> None:
+        # phase 2-4 – bid on others
+        self._maybe_bid()
 
-        # advance cycle
-        self._cycle_pos = (self._cycle_pos + 1) % self.CYCLE_LENGTH
+    @property
+    def can_offer(self) -> bool:
+        return self.offers_made < self.OFFERS_LIMIT and len(self.order_book) > 0
 
     # ── phase 1 : offer ────────────────────────────────────────────────
-    def _offer_worst_order(self) -> None:
+    def _offer_worst_order(self) -> bool:
         if self.offers_made >= self.OFFERS_LIMIT:
-            return # stop offering if limit reached
+            return False # stop offering if limit reached
+        if not self._orders:
+            return False # sold everything, nothing to offer
         profits = self.cost_model.pj()               # [all, without 1, without 2, …]
         base = profits[0]
         gains = [profits[i] - base for i in range(1, len(profits))]
         # pick order whose removal gives biggest gain (or smallest loss)
         idx = max(range(len(gains)), key=lambda i: gains[i])
         if gains[idx] <= 0:
-            idx = 0  # nothing improves profit → just drop first order
+            # nothing improves profit → offer any order, drawn from the
+            # model's seeded RNG so that replications differ
+            idx = self.model.random.randrange(len(gains))
 
-        worst_row = self._orders[idx]
-        pickup_id = worst_row[1]
-        order_row = self._orders[idx]             # [pk, pickup, delivery]
+        order_row = self._orders[idx]             # (pk, pickup, delivery)
+        pickup_id = order_row[1]
 
         payload = {
             "req_id": self.model.next_req_id(),
@@ -124,78 +230,134 @@ class CarrierAgent(Agent):
             "demand": 0,                   # legacy field
             "min_price": self.cost_model.rj(),     # revenue baseline
         }
-        requests.post(f"{AUCTIONEER_URL}/start_auction", json=payload, timeout=5)
+        self.model.auctioneer_client.start_auction(payload)
         print(f"[{self.carrier_id}] OFFER order {order_row[0]} "
               f"({pickup_id}->{order_row[2]}) min={payload['min_price']:.1f}")
         self._auction_req_id = payload["req_id"]
-        self._auction_order_row = idx
+        self._auction_order_pk = order_row[0]
         self.offers_made += 1
+        return True
+
+    def _offer_worst_bundle(self) -> bool:
+        if self.offers_made >= self.OFFERS_LIMIT:
+            return False # stop offering if limit reached
+        profits = self.cost_model.pj()               # [all, without 1, without 2, …]
+        rows = self._orders
+        worst = sorted(range(len(rows)), key=lambda i: profits[i + 1], reverse=True)[:self.BUNDLE_SIZE]
+        if not worst:
+            return False
+        orders = [{"order_pk": rows[i][0], "node_id": rows[i][1], "delivery": rows[i][2]} for i in worst]
+
+        payload = {
+            "req_id": self.model.next_req_id(),
+            "seller_id": self.carrier_id,
+            "node_id": orders[0]["node_id"],
+            "delivery": orders[0]["delivery"],
+            "order_pk": orders[0]["order_pk"],
+            "demand": 0,                   # legacy field
+            "min_price": self.cost_model.rj(),     # revenue baseline
+            "orders": orders,
+        }
+        self.model.auctioneer_client.start_auction(payload)
+        print(f"[{self.carrier_id}] OFFER bundle {[o['order_pk'] for o in orders]} "
+              f"min={payload['min_price']:.1f}")
+        self._auction_req_id = payload["req_id"]
+        self.offers_made += 1
+        return True
 
     # ── phase 2-4 : bid ──────────────────────────────────
     def _maybe_bid(self) -> None:
-        r = requests.get(f"{AUCTIONEER_URL}/next_request", timeout=5).json()
-        if r.get("status") == "none" or r["seller_id"] == self.carrier_id:
-            return
-        delta = self.cost_model.profit_if_added(r["seller_id"], r["node_id"], r["delivery"])
-        #print(f"[{self.carrier_id}] Δprofit if added = {delta:.1f}")#debug
-        if delta > 0:
-            payload = {"carrier_id": self.carrier_id, "req_id": r["req_id"], "value": delta}
-            if r["req_id"] == self._already_bid_req:
-                return
-            print(f"[{self.carrier_id}] BID {delta:.1f} on {r['seller_id']}:{r['order_pk']}")
-            requests.post(f"{AUCTIONEER_URL}/bid", json=payload, timeout=5)
-            self._already_bid_req = r["req_id"]
+        bundle_auctions = []
+        open_auctions = self.model.auctioneer_client.open_auctions()
+        open_reqs = {r["req_id"] for r in open_auctions}
+        self._already_bid_reqs.intersection_update(open_reqs)
+        self._pending_bids = {req: order for req, order in self._pending_bids.items() if req in open_reqs}
+        for r in open_auctions:
+            if r["seller_id"] == self.carrier_id or r["req_id"] in self._already_bid_reqs:
+                continue
+            if r.get("orders"):
+                bundle_auctions.append(r)
+                continue
+            # priced with the orders we already bid on: we may win them all
+            delta = self.cost_model.profitIfAdded(r["seller_id"], r["node_id"], r["delivery"],
+                                                  list(self._pending_bids.values()))
+            #print(f"[{self.carrier_id}] Δprofit if added = {delta:.1f}")#debug
+            if delta > 0:
+                payload = {"carrier_id": self.carrier_id, "req_id": r["req_id"], "value": delta}
+                print(f"[{self.carrier_id}] BID {delta:.1f} on {r['seller_id']}:{r['order_pk']}")
+                self.model.auctioneer_client.bid(payload)
+                metrics.count("agent.bids")
+                self._already_bid_reqs.add(r["req_id"])
+                self._pending_bids[r["req_id"]] = (r["seller_id"], r["node_id"], r["delivery"])
+        if bundle_auctions:
+            self._bid_on_bundles(bundle_auctions)
+
+    def _bid_on_bundles(self, auctions: List[Dict]) -> None:
+        """One XOR bid per valuable combination of the offered orders."""
+        orders = [order for r in auctions for order in r["orders"]]
+        bundles = self.cost_model.bundleValues([(o["node_id"], o["delivery"]) for o in orders],
+                                               max_size=self.MAX_BUNDLE)
+        for bundle, delta in bundles:
+            items = [orders[i]["item_id"] for i in bundle]
+            print(f"[{self.carrier_id}] BID {delta:.1f} on bundle {items}")
+            self.model.auctioneer_client.bundle_bid(
+                {"carrier_id": self.carrier_id, "items": items, "value": delta})
+            metrics.count("agent.bundle_bids")
+        self._already_bid_reqs.update(r["req_id"] for r in auctions)
 
     # ── apply auction outcome ──────────────────────────────────────────
-    def _apply_result(self, res: Dict) -> None:
+    def _apply_result(self, res: Dict) -> bool:
+        """Apply one closed auction to our orders; True if they changed."""
+        changed = False
         # we SOLD the order
-        self._already_bid_req = None
         winner = res.get("winner_id", res.get("winner"))
         print(f"[{self.carrier_id}] AUCTION closed winner={winner} "
               f"seller={res['seller_id']} req={res['req_id']}")
 
-        if res["seller_id"] == self.carrier_id and winner != self.carrier_id:
-            rows = self._orders
-            if self._auction_order_row is not None and self._auction_order_row < len(rows):
-                del rows[self._auction_order_row]
-                self._write_orders(rows)
-                self.cost_model.invalidate()
-                # refresh caches
-                """self.cost_model = CostModel(
-                    self.cost_model.a1,
-                    self.cost_model.a2,
-                    self.cost_model.b1,
-                    self.cost_model.b2,
-                    self.order_csv,
-                    self.travel_csv,
-                )"""
+        if res.get("item_id") is not None:
+            changed = self._apply_bundle_item(res, winner)
+        elif res["seller_id"] == self.carrier_id and winner != self.carrier_id:
+            if self._auction_order_pk is not None:
+                changed = self.order_book.remove(self._auction_order_pk) is not None
+                self._auction_order_pk = None
         # ── we BOUGHT the order ──
         elif winner == self.carrier_id and res["seller_id"] != self.carrier_id:
-            new_row = [res["order_pk"], res["node_id"], res["delivery"]]
-            rows = self._orders + [new_row]
-            self._write_orders(rows)
-            self.cost_model.invalidate()
+            self.order_book.add(Order(res["order_pk"], res["node_id"], res["delivery"]))
+            changed = True
 
-        # clear bid memo so we can bid in next auction
-        self._already_bid_req = None
+        # clear bid memo, the auction is over
+        self._already_bid_reqs.discard(res["req_id"])
+        self._pending_bids.pop(res["req_id"], None)
+        return changed
 
-        if res.get("status") != "closed":
-            return
+    def _apply_bundle_item(self, res: Dict, winner: Optional[str]) -> bool:
+        """Unsold bundle items stay with the seller."""
+        if winner is None or winner == res["seller_id"]:
+            return False
+        if res["seller_id"] == self.carrier_id:
+            return self.order_book.remove(res["order_pk"]) is not None
+        if winner == self.carrier_id:
+            self.order_book.add(Order(res["order_pk"], res["node_id"], res["delivery"]))
+            return True
+        return False
 
 # ──────────────────────────────────────────────────────────────────────
-# AuctioneerAgent – unchanged (just closes auction every cycle)
+# AuctioneerAgent – closes every open auction at the cycle's bid deadline
 # ──────────────────────────────────────────────────────────────────────
 class AuctioneerAgent(Agent):
     def __init__(self, unique_id: int, model):
         self.unique_id = unique_id
         self.model = model
+
     def step(self) -> None:
-        if self.model.tick % CarrierAgent.CYCLE_LENGTH == 0:
-            try:
-                r = requests.post(f"{AUCTIONEER_URL}/close_auction", timeout=5)
-                r.raise_for_status()
-                self.model.last_auction_result = r.json()
-            except requests.RequestException:
-                self.model.last_auction_result = {}
+        """Nothing to do per tick; the model calls on_close when due."""
+
+    @metrics.timed("agent.close")
+    def on_close(self) -> List[Dict]:
+        try:
+            self.model.last_auction_results = self.model.auctioneer_client.close_auctions()
+        except requests.RequestException:
+            self.model.last_auction_results = []
+        return self.model.last_auction_results
 
 
@@ -0,0 +1,47 @@
+"""
+Event queue driving the auction cycle.
+
+An event names a tick, a handler and the agents it concerns; the model
+calls agent.on_<kind>(**data) for exactly those agents when the tick
+comes round. Agents with nothing due are not touched.
+
+    results  carriers named in closed auctions apply the trades (orders a
+             buyer cannot route go back to the seller)
+    offer    carriers with offers left put their worst order(s) up
+    bid      carriers other than the sellers bid on the open auctions
+    close    the auctioneer closes every open auction (bid deadline)
+"""
+
+import heapq
+import itertools
+from typing import Dict, List, Sequence
+
+
+class Event:
+    __slots__ = ("tick", "kind", "agents", "data")
+
+    def __init__(self, tick: int, kind: str, agents: Sequence, data: Dict):
+        self.tick = tick
+        self.kind = kind
+        self.agents = list(agents)
+        self.data = data
+
+
+class AuctionClock:
+    def __init__(self):
+        self._queue: List[tuple] = []        # (tick, seq, Event)
+        self._seq = itertools.count()
+
+    def schedule(self, tick: int, kind: str, agents: Sequence, **data) -> None:
+        if agents:
+            heapq.heappush(self._queue, (tick, next(self._seq), Event(tick, kind, agents, data)))
+
+    def due(self, tick: int) -> List[Event]:
+        """Pop the events up to and including tick, in scheduling order."""
+        events = []
+        while self._queue and self._queue[0][0] <= tick:
+            events.append(heapq.heappop(self._queue)[2])
+        return events
+
+    def __len__(self) -> int:
+        return len(self._queue)
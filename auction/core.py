@@ -6,74 +6,191 @@ Now uses PnD routing & order-based cost model.
 import os
 import json
 import time
-from typing import List
+from typing import List, Optional
 
 from mesa import Model
 from mesa.time import RandomActivation
 
-from auction.agents import CarrierAgent, AuctioneerAgent
-from models.pickupDelivery import solve_PnD_problem
-
-# quick param table  (a1, a2, b1, b2) per carrier
-PARAMS = [
-    (1.0, 1.4, 2.0, 1.0),
-    (1.5, 1.2, 1.9, 1.0),
-    (0.9, 1.4, 2.9, 0.9),
-]
+from auction.agents import CarrierAgent, AuctioneerAgent, make_transport
+from auction.clock import AuctionClock
+from auction.scenario import Scenario, defaultScenario
+from auction.snapshot_store import SNAPSHOT_LOG
+from models import metrics
+from models.solverConfig import SolverConfig
 
 
 class CarrierModel(Model):
-    def __init__(self, n_carriers: int = 3):
-        super().__init__()
+    """
+    The carriers of a scenario (auction.scenario; the three default ones
+    if None), optionally cut to the first n_carriers, with params and
+    carriers_dir overriding the scenario's.
+
+    At each cycle end the carriers whose orders changed since their last
+    snapshot get a fresh <carrier_id>_vrp.json, taken from the route their
+    cost model already holds, and one line {"tick", "carriers": {ID:
+    snapshot}} is appended to SNAPSHOT_LOG in carriers_dir. Callables in
+    snapshot_listeners get (tick, {ID: snapshot}) too, with or without
+    write_snapshots.
+    """
+
+    def __init__(self, n_carriers: Optional[int] = None, solver_configs: Optional[List[SolverConfig]] = None,
+                 transport: str = "http", auctioneer_client=None, auction_mode: str = "single",
+                 params: Optional[List[tuple]] = None, carriers_dir: Optional[str] = None,
+                 write_snapshots: bool = True, seed: Optional[int] = None,
+                 persist_every: Optional[int] = 1, scenario: Optional[Scenario] = None):
+        super().__init__()      # seed is picked up by mesa.Model.__new__
+        scenario = scenario or defaultScenario()
+        if n_carriers is not None:
+            scenario = scenario.head(n_carriers)
+        if params is not None:
+            scenario = scenario.withParams(params)
+        if carriers_dir is not None:
+            scenario = scenario.withCarriersDir(carriers_dir)
+        self.scenario = scenario
+        self.carriers_dir = carriers_dir = scenario.carriers_dir
+        self.write_snapshots = write_snapshots
+        self.trades = 0         # auctions closed with a winner
+        # order books are the source of truth; written back to the CSVs
+        # every persist_every cycles (None = only on persist_orders())
+        self.order_books = {}
+        self.persist_every = persist_every
+        self._snapshot_versions = {}      # carrier ID -> order book version last written
+        self.snapshot_listeners = []
+        # one auctioneer transport shared by every agent ("http" / "inprocess")
+        self.auctioneer_client = auctioneer_client or make_transport(transport, len(scenario))
         self.schedule = RandomActivation(self)
         self.tick = 0
         self._next_req = 0
-        self.last_auction_result = {}
+        self.last_auction_results = []
 
         # carriers -------------------------------------------------------
         self.carriers: List[CarrierAgent] = []
-        for i in range(n_carriers):
-            depot_coord = {
-                0: (-40, -290),
-                1: (-170, 200),
-                2: (110, 200),
-            }[i]
+        for i, spec in enumerate(scenario.carriers):
             c = CarrierAgent(
                 i,
                 self,
-                f"C{i}",
-                f"orderC{i}.csv",
-                f"travelMatrixC{i}.csv",
-                *PARAMS[i],
-                depot_coord=depot_coord
+                spec.carrier_id,
+                spec.order_csv,
+                f"travelMatrix{spec.carrier_id}.csv",
+                *spec.params,
+                depot_coord=spec.depot,
+                solver_config=solver_configs[i] if solver_configs else None,
+                auction_mode=auction_mode,
+                carriers_dir=carriers_dir,
+                order_books=self.order_books,
+                depot_id=spec.depot_id,
+                node_file=scenario.node_file
             )
             self.carriers.append(c)
             self.schedule.add(c)
 
         # single auctioneer ---------------------------------------------
-        self.auctioneer = AuctioneerAgent(unique_id=999, model=self)
+        self.auctioneer = AuctioneerAgent(unique_id=len(self.carriers), model=self)
         self.schedule.add(self.auctioneer)
 
+        # auction clock: only agents with an event due are activated ------
+        self.clock = AuctionClock()
+        self.clock.schedule(2, "offer", self.carriers)
+
+        if write_snapshots:
+            self._write_snapshot_index()
+
+    def _write_snapshot_index(self) -> None:
+        """_carriers.json lists whose *_vrp.json snapshots the GUI should read; the log starts empty."""
+        os.makedirs(self.carriers_dir, exist_ok=True)
+        with open(os.path.join(self.carriers_dir, "_carriers.json"), "w") as fp:
+            json.dump({"carriers": [c.carrier_id for c in self.carriers],
+                       "node_file": self.scenario.node_file}, fp, indent=2)
+        open(os.path.join(self.carriers_dir, SNAPSHOT_LOG), "w").close()
+
+    def _snapshot(self, c: CarrierAgent) -> dict:
+        return {**c.cost_model.solution,
+                "carrier_id": c.carrier_id,
+                "warehouse_location": [c.depot_coord["x"], c.depot_coord["y"]],
+                "profit": c.cost_model.profit_information[0]}
+
+    def emit_snapshots(self) -> dict:
+        """Snapshot the carriers whose orders changed; returns {carrier ID: snapshot}."""
+        delta = {c.carrier_id: self._snapshot(c) for c in self.carriers
+                 if self._snapshot_versions.get(c.carrier_id) != c.order_book.version}
+        if not delta:
+            return delta
+        for c in self.carriers:
+            self._snapshot_versions[c.carrier_id] = c.order_book.version
+        for listener in self.snapshot_listeners:
+            listener(self.tick, delta)
+        if not self.write_snapshots:
+            return delta
+        for ID, snapshot in delta.items():
+            out = os.path.join(self.carriers_dir, f"{ID}_vrp.json")
+            with open(f"{out}.tmp", "w") as fp:
+                json.dump(snapshot, fp, separators=(",", ":"))
+            os.replace(f"{out}.tmp", out)
+        with open(os.path.join(self.carriers_dir, SNAPSHOT_LOG), "a") as fp:
+            fp.write(json.dumps({"tick": self.tick, "carriers": delta}, separators=(",", ":")) + "\n")
+        return delta
+
+    def persist_orders(self) -> None:
+        for c in self.carriers:
+            c.save_orders()
+
     # helper for unique request IDs -------------------------------------
     def next_req_id(self) -> str:
         self._next_req += 1
         return f"R{self._next_req}"
 
+    # auction clock follow-ups -------------------------------------------
+    def _cycle_end(self) -> int:
+        return self.tick + (-self.tick) % CarrierAgent.CYCLE_LENGTH
+
+    def _after_offer(self, sellers: List[CarrierAgent], opened: List[bool]) -> None:
+        self.clock.schedule(self.tick + CarrierAgent.CYCLE_LENGTH, "offer",
+                            [c for c in sellers if c.can_offer])
+        if any(opened):
+            self.clock.schedule(self.tick + 1, "bid", self.carriers)
+            self.clock.schedule(self._cycle_end(), "close", [self.auctioneer])
+
+    def _after_close(self, agents, outcome: List[List[dict]]) -> None:
+        results = outcome[0]
+        self.trades += sum(res.get("winner_id") is not None for res in results)
+        involved = {ID for res in results for ID in (res["seller_id"], res.get("winner_id"))}
+        self.clock.schedule(self.tick + 1, "results",
+                            [c for c in self.carriers if c.carrier_id in involved], results=results)
+
+    def _after_results(self, agents, outcome: List[List[tuple]]) -> None:
+        """Orders a buyer could not route go back to their sellers; the trade did not happen."""
+        sellers = {}
+        for seller_id, order in (returned for rolled_back in outcome for returned in rolled_back):
+            seller = next(c for c in self.carriers if c.carrier_id == seller_id)
+            seller.order_book.add(order)
+            sellers[seller_id] = seller
+            self.trades -= 1
+        for seller in sellers.values():
+            seller.cost_model.invalidate()
+
     # Mesa tick ----------------------------------------------------------
+    @metrics.timed("tick")
     def step(self) -> None:
         self.tick += 1
-        self.schedule.step()
-
-        # dump snapshots each cycle end (GUI expects *_vrp.json) ---------
-        from_path = "auction/carriers_info"
-        if self.tick % CarrierAgent.CYCLE_LENGTH == 0:
-            for c in self.carriers:
-                res = solve_PnD_problem(c.cost_model.path_order, c.cost_model.path_travel_matrix, 
-                                        depot_id=c.depot_id)
-                res["warehouse_location"] = [c.depot_coord["x"], c.depot_coord["y"]]
-                out = os.path.join(from_path, f"{c.carrier_id}_vrp.json")
-                os.makedirs(from_path, exist_ok=True)
-                with open(out, "w") as fp:
-                    json.dump(res, fp, indent=2)
+        self.auctioneer_client.new_tick()
+        while events := self.clock.due(self.tick):
+            for event in events:
+                agents = list(event.agents)
+                self.random.shuffle(agents)
+                with metrics.timer(f"tick.{event.kind}"):
+                    outcome = [getattr(agent, f"on_{event.kind}")(**event.data) for agent in agents]
+                    follow_up = getattr(self, f"_after_{event.kind}", None)
+                    if follow_up:
+                        follow_up(agents, outcome)
+        with metrics.timer("tick.flush_bids"):
+            self.auctioneer_client.flush_bids()
 
+        cycle = self.tick // CarrierAgent.CYCLE_LENGTH
+        if self.persist_every and self.tick % CarrierAgent.CYCLE_LENGTH == 0 and cycle % self.persist_every == 0:
+            with metrics.timer("tick.persist_orders"):
+                self.persist_orders()
 
+        # snapshots of the carriers that traded (GUI reads *_vrp.json) --
+        if (self.write_snapshots or self.snapshot_listeners) and self.tick % CarrierAgent.CYCLE_LENGTH == 0:
+            with metrics.timer("tick.snapshots"):
+                self.emit_snapshots()
@@ -0,0 +1,112 @@
+"""
+Client side of the auctioneer service, shared by every agent of a model.
+
+    • one keep-alive requests.Session, pooled connections sized for the
+      number of carriers (at most MAX_POOL_SIZE), retries with exponential backoff on connection
+      errors; 5xx answers are retried for the idempotent GETs only, a
+      POST (start, bid, close) that reached the service is never re-sent
+    • /open_auctions is fetched once per tick and shared by all carriers
+    • bids are queued and sent concurrently by flush_bids(), which the
+      model calls before the auction closes and at the end of every tick
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from models import metrics
+
+AUCTIONEER_URL = "http://localhost:8000"
+MAX_POOL_SIZE = 64      # connections / bid threads, however many carriers there are
+
+
+class AuctioneerClient:
+    def __init__(self, base_url: str = AUCTIONEER_URL, pool_size: int = 32,
+                 retries: int = 3, backoff: float = 0.1, timeout: float = 5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        # default allowed_methods: no status or read retries for POST
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._open_auctions: Optional[List[Dict]] = None
+        self._pending_bids: List[tuple] = []      # (path, payload)
+        self._bid_pool: Optional[ThreadPoolExecutor] = None
+
+    # ── transport ───────────────────────────────────────────────────────
+    def _post(self, path: str, payload: Optional[Dict] = None) -> Dict:
+        with metrics.timer(f"http.post{path}"):
+            r = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+            r.raise_for_status()
+            return r.json()
+
+    def _get(self, path: str) -> Dict:
+        with metrics.timer(f"http.get{path}"):
+            r = self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+            r.raise_for_status()
+            return r.json()
+
+    # ── auction protocol ────────────────────────────────────────────────
+    def start_auction(self, payload: Dict) -> Dict:
+        self._open_auctions = None
+        return self._post("/start_auction", payload)
+
+    def next_request(self) -> Dict:
+        """The oldest open auction."""
+        auctions = self.open_auctions()
+        return auctions[0] if auctions else {"status": "none"}
+
+    def open_auctions(self) -> List[Dict]:
+        """Every open auction, fetched at most once per tick."""
+        if self._open_auctions is None:
+            self._open_auctions = self._get("/open_auctions")
+        return self._open_auctions
+
+    def bid(self, payload: Dict) -> None:
+        """Queue a bid; it is sent with the next flush_bids()."""
+        self._pending_bids.append(("/bid", payload))
+
+    def bundle_bid(self, payload: Dict) -> None:
+        """Queue a bid {"carrier_id", "items", "value"} on a set of bundle items."""
+        self._pending_bids.append(("/bundle_bid", payload))
+
+    def flush_bids(self) -> List[Dict]:
+        """Send every queued bid concurrently over the pooled connections."""
+        bids, self._pending_bids = self._pending_bids, []
+        if len(bids) <= 1:
+            return [self._post(path, payload) for path, payload in bids]
+        if self._bid_pool is None:
+            self._bid_pool = ThreadPoolExecutor(max_workers=self.pool_size)
+        return list(self._bid_pool.map(lambda bid: self._post(*bid), bids))
+
+    def close_auction(self) -> Dict:
+        """Close the oldest open auction."""
+        self.flush_bids()
+        self._open_auctions = None
+        return self._post("/close_auction")
+
+    def close_auctions(self) -> List[Dict]:
+        """Close every open auction in one round-trip."""
+        self.flush_bids()
+        self._open_auctions = None
+        return self._post("/close_auctions")
+
+    # ── housekeeping ────────────────────────────────────────────────────
+    def new_tick(self) -> None:
+        """Forget the cached /open_auctions answer."""
+        self._open_auctions = None
+
+    def close(self) -> None:
+        if self._bid_pool is not None:
+            self._bid_pool.shutdown()
+            self._bid_pool = None
+        self.session.close()
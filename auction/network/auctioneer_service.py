@@ -1,10 +1,24 @@
-from fastapi import FastAPI
+import os
+import sys
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
 import uvicorn
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from auction.network.vickrey import VickreyAuctioneer
+from models import metrics
+
 app = FastAPI(title="Auctioneer Service")
 
+# per-endpoint timings, recorded when metrics are on (CCN_METRICS=1)
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    with metrics.timer(f"service{request.url.path}"):
+        return await call_next(request)
+
 class AuctionRequest(BaseModel):
     req_id: str
     seller_id: str
@@ -13,48 +27,52 @@ class AuctionRequest(BaseModel):
     order_pk: str 
     min_price: float
     demand: int
+    orders: Optional[List[Dict[str, str]]] = None   # bundle auction
+
+class BundleBid(BaseModel):
+    carrier_id: str
+    items: List[str]
+    value: float
 
 class Bid(BaseModel):
     carrier_id: str
     req_id: str
     value: float
 
-current_auction: Optional[AuctionRequest] = None
-bids: List[Bid] = []
+auctioneer = VickreyAuctioneer()
 
 @app.get("/next_request")
 def get_next_request():
-    return {"status": "open", **current_auction.model_dump()} \
-           if current_auction else {"status": "none"}
+    return auctioneer.next_request()
+
+@app.get("/open_auctions")
+def get_open_auctions():
+    return auctioneer.open_auctions()
 
 @app.post("/start_auction")
 def start_auction(req: AuctionRequest):
-    global current_auction, bids
-    current_auction = req
-    bids = []
-    return {"status": "started", **req.dict()}
+    return auctioneer.start_auction(req.model_dump(exclude_none=True))
 
 @app.post("/bid")
 def place_bid(bid: Bid):
-    if not current_auction or bid.req_id != current_auction.req_id:
-        return {"status": "no_active_auction"}
-    bids.append(bid)
-    return {"status": "received"}
+    return auctioneer.place_bid(bid.model_dump())
+
+@app.post("/bundle_bid")
+def place_bundle_bid(bid: BundleBid):
+    return auctioneer.place_bundle_bid(bid.model_dump())
 
 @app.post("/close_auction")
-def close_auction():
-    global current_auction
-    if not current_auction:
-        return {"status": "none"}
-    sorted_bids = sorted(bids, key=lambda b: b.value, reverse=True)
-    winner = sorted_bids[0] if sorted_bids else None
-    price = sorted_bids[1].value if len(sorted_bids) > 1 else (winner.value if winner else 0)
-    result = {"winner_id": winner.carrier_id if winner else None,
-              "winner": winner.carrier_id if winner else None,
-              "price": price,
-              **current_auction.model_dump()}
-    current_auction = None
-    return result
+def close_auction(req_id: Optional[str] = None):
+    return auctioneer.close_auction(req_id)
+
+@app.post("/close_auctions")
+def close_auctions(req_ids: Optional[List[str]] = None):
+    return auctioneer.close_auctions(req_ids)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text format."""
+    return PlainTextResponse(metrics.toPrometheus(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
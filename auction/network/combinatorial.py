@@ -0,0 +1,115 @@
+"""
+Winner determination for combinatorial (bundle) auctions.
+
+Bids are dicts {"carrier_id", "items": [item IDs], "value"} and are XOR
+bids: a carrier wins at most one of its bundles, and no item is sold
+twice. The allocation maximising the sum of winning values is found by
+depth-first branch and bound over the items:
+
+    • every node keeps the bids still compatible with the partial
+      allocation and branches on the item fewest of them cover: each bid
+      for it, best value first, then "unsold"
+    • the bound is the smaller of two relaxations over those bids: the
+      best per-item share (value / bundle size) summed over items, and
+      the best single bid summed over carriers
+    • a greedy allocation seeds the incumbent, and the search stops after
+      time_limit seconds, returning the best allocation found so far
+
+Winners pay VCG prices, the generalisation of the second-price rule.
+"""
+
+import time
+from typing import Dict, List, Sequence, Tuple
+
+TIME_LIMIT = 1.0        # seconds per winner determination
+
+
+def _prepare(bids: Sequence[Dict], item_ids: Sequence[str]):
+    item_bit = {item: 1 << k for k, item in enumerate(item_ids)}
+    bidder_bit: Dict[str, int] = {}
+    usable, masks = [], []
+    for i, bid in enumerate(bids):
+        if bid["value"] <= 0 or not bid["items"] or any(item not in item_bit for item in bid["items"]):
+            continue
+        if bid["carrier_id"] not in bidder_bit:
+            bidder_bit[bid["carrier_id"]] = 1 << (len(item_ids) + len(bidder_bit))
+        mask = bidder_bit[bid["carrier_id"]]
+        for item in set(bid["items"]):
+            mask |= item_bit[item]
+        usable.append(i)
+        masks.append(mask)
+    return usable, masks
+
+
+def winner_determination(bids: Sequence[Dict], item_ids: Sequence[str],
+                         time_limit: float = TIME_LIMIT, incumbent: Sequence[int] = ()) -> Tuple[float, List[int]]:
+    """Return (total value, indices into bids of the winning bids).
+
+    incumbent, a feasible set of bid indices, is tried before the greedy start.
+    """
+    usable, masks = _prepare(bids, item_ids)
+    values = [bids[i]["value"] for i in usable]
+    item_index = {item: k for k, item in enumerate(item_ids)}
+    bid_items = [{item_index[item] for item in bids[i]["items"]} for i in usable]
+    shares = [values[b] / len(bid_items[b]) for b in range(len(usable))]
+    bidder = [bids[i]["carrier_id"] for i in usable]
+
+    # greedy incumbent: the given bids, then the highest values first
+    by_value = sorted(range(len(usable)), key=values.__getitem__, reverse=True)
+    position = {i: b for b, i in enumerate(usable)}
+    best_value, best_chosen, taken = 0.0, [], 0
+    for b in [position[i] for i in incumbent if i in position] + by_value:
+        if masks[b] & taken == 0:
+            taken |= masks[b]
+            best_value += values[b]
+            best_chosen.append(b)
+
+    deadline = time.monotonic() + time_limit
+
+    def search(live: List[int], value: float, chosen: List[int]) -> None:
+        nonlocal best_value, best_chosen
+        if value > best_value:
+            best_value, best_chosen = value, list(chosen)
+        if not live or time.monotonic() > deadline:
+            return
+
+        item_share: Dict[int, float] = {}
+        bidder_best: Dict[str, float] = {}
+        covering: Dict[int, List[int]] = {}
+        for b in live:
+            if values[b] > bidder_best.get(bidder[b], 0.0):
+                bidder_best[bidder[b]] = values[b]
+            for k in bid_items[b]:
+                covering.setdefault(k, []).append(b)
+                if shares[b] > item_share.get(k, 0.0):
+                    item_share[k] = shares[b]
+        if value + min(sum(item_share.values()), sum(bidder_best.values())) <= best_value:
+            return
+
+        # branch on the most constrained item: sell it to one of its bids, or not at all
+        k = min(covering, key=lambda k: len(covering[k]))
+        for b in covering[k]:
+            chosen.append(b)
+            search([c for c in live if masks[c] & masks[b] == 0], value + values[b], chosen)
+            chosen.pop()
+        search([c for c in live if k not in bid_items[c]], value, chosen)
+
+    search(by_value, 0.0, [])
+    return best_value, sorted(usable[b] for b in best_chosen)
+
+
+def vcg_payments(bids: Sequence[Dict], item_ids: Sequence[str], winners: Sequence[int],
+                 welfare: float, time_limit: float = TIME_LIMIT) -> Dict[int, float]:
+    """
+    Payment of every winning bid: the harm its carrier does to the others.
+    The re-solves share time_limit and start from the winning allocation
+    minus that carrier, so a cut-off search can only under-charge.
+    """
+    payments = {}
+    for w in winners:
+        carrier = bids[w]["carrier_id"]
+        others = [bid if bid["carrier_id"] != carrier else {**bid, "value": 0} for bid in bids]
+        welfare_without = winner_determination(others, item_ids, time_limit / len(winners),
+                                               [i for i in winners if i != w])[0]
+        payments[w] = max(welfare_without - (welfare - bids[w]["value"]), 0.0)
+    return payments
@@ -0,0 +1,164 @@
+"""
+Vickrey (second-price, sealed-bid) auction state, free of any transport.
+
+Served over HTTP by auctioneer_service.py and called directly by the
+in-process transport; requests, bids and results are plain dicts.
+Any number of auctions can be open at once, keyed by req_id. Each keeps
+only its two best bids, updated as bids arrive, so closing is O(1); a
+carrier bids once per auction and later bids from it are rejected. All
+state changes happen under one lock, so the service's worker threads
+may call in concurrently.
+
+A request carrying an "orders" list opens a bundle auction instead: each
+order becomes an item "<req_id>/<order_pk>", carriers bid on sets of items
+from any open bundle auctions, and closing sells the items of all of them
+at once by winner determination with VCG prices (combinatorial.py).
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from auction.network.combinatorial import vcg_payments, winner_determination
+from models import metrics
+
+
+class _Auction:
+    __slots__ = ("req", "bidders", "first", "second")
+
+    def __init__(self, req: Dict):
+        self.req = dict(req)
+        self.bidders = set()
+        self.first: Optional[tuple] = None      # (value, carrier_id), ties go to the earlier bid
+        self.second: Optional[tuple] = None
+
+    def add(self, carrier_id: str, value: float) -> bool:
+        if carrier_id in self.bidders:
+            return False
+        self.bidders.add(carrier_id)
+        if self.first is None or value > self.first[0]:
+            self.first, self.second = (value, carrier_id), self.first
+        elif self.second is None or value > self.second[0]:
+            self.second = (value, carrier_id)
+        return True
+
+    def result(self) -> Dict:
+        winner = self.first[1] if self.first else None
+        price = self.second[0] if self.second else (self.first[0] if self.first else 0)
+        return {"winner_id": winner,
+                "winner": winner,
+                "price": price,
+                **self.req}
+
+
+class _BundleAuction:
+    def __init__(self, req: Dict):
+        self.req = dict(req)
+        self.req["orders"] = [{**order, "item_id": f"{req['req_id']}/{order['order_pk']}"}
+                              for order in req["orders"]]
+        self.items = {order["item_id"]: order for order in self.req["orders"]}
+
+
+class VickreyAuctioneer:
+    def __init__(self):
+        self.auctions: Dict[str, _Auction] = {}     # insertion order = age
+        self.bundle_auctions: Dict[str, _BundleAuction] = {}
+        self.bundle_bids: List[Dict] = []
+        self._lock = threading.Lock()
+
+    # ── queries ─────────────────────────────────────────────────────────
+    def open_auctions(self) -> List[Dict]:
+        with self._lock:
+            return [{"status": "open", **auction.req}
+                    for auction in [*self.auctions.values(), *self.bundle_auctions.values()]]
+
+    def next_request(self) -> Dict:
+        """The oldest open auction (single-auction protocol)."""
+        with self._lock:
+            auction = next(iter(self.auctions.values()), None)
+            return {"status": "open", **auction.req} if auction else {"status": "none"}
+
+    # ── updates ─────────────────────────────────────────────────────────
+    def start_auction(self, req: Dict) -> Dict:
+        with self._lock:
+            self.auctions.pop(req["req_id"], None)
+            self.bundle_auctions.pop(req["req_id"], None)
+            if req.get("orders"):
+                self.bundle_auctions[req["req_id"]] = _BundleAuction(req)
+            else:
+                self.auctions[req["req_id"]] = _Auction(req)
+        return {"status": "started", **req}
+
+    def place_bid(self, bid: Dict) -> Dict:
+        with self._lock:
+            auction = self.auctions.get(bid["req_id"])
+            if auction is None:
+                return {"status": "no_active_auction"}
+            if not auction.add(bid["carrier_id"], bid["value"]):
+                return {"status": "duplicate_bid"}
+        return {"status": "received"}
+
+    def place_bundle_bid(self, bid: Dict) -> Dict:
+        """XOR bid {"carrier_id", "items", "value"} on items of open bundle auctions."""
+        with self._lock:
+            sellers = set()
+            for item in bid["items"]:
+                auction = self.bundle_auctions.get(item.rsplit("/", 1)[0])
+                if auction is None or item not in auction.items:
+                    return {"status": "no_active_auction"}
+                sellers.add(auction.req["seller_id"])
+            if bid["carrier_id"] in sellers:
+                return {"status": "own_item"}
+            self.bundle_bids.append(dict(bid))
+        return {"status": "received"}
+
+    def close_auction(self, req_id: Optional[str] = None) -> Dict:
+        """Close one auction, the oldest open one if req_id is None."""
+        with self._lock:
+            if req_id is None:
+                req_id = next(iter(self.auctions), None)
+            auction = self.auctions.pop(req_id, None) if req_id is not None else None
+        return auction.result() if auction else {"status": "none"}
+
+    def close_auctions(self, req_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Close the given auctions (all open ones if None), oldest first."""
+        with self._lock:
+            if req_ids is None:
+                req_ids = [*self.auctions, *self.bundle_auctions]
+            closed = [self.auctions.pop(req_id) for req_id in req_ids if req_id in self.auctions]
+            bundles = [self.bundle_auctions.pop(req_id) for req_id in req_ids
+                       if req_id in self.bundle_auctions]
+            items = {item: auction for auction in bundles for item in auction.items}
+            bids = [bid for bid in self.bundle_bids if all(item in items for item in bid["items"])]
+            self.bundle_bids = [bid for bid in self.bundle_bids if not any(item in items for item in bid["items"])]
+        metrics.count("auction.closed", len(closed) + len(bundles))
+        return [auction.result() for auction in closed] + self._close_bundles(items, bids)
+
+    @staticmethod
+    def _close_bundles(items: Dict[str, _BundleAuction], bids: List[Dict]) -> List[Dict]:
+        """One result per item, in the single-auction schema plus "bundle"."""
+        item_ids = list(items)
+        with metrics.timer("auction.winner_determination"):
+            welfare, winners = winner_determination(bids, item_ids)
+        with metrics.timer("auction.vcg_payments"):
+            payments = vcg_payments(bids, item_ids, winners, welfare)
+
+        sold = {}
+        for w in winners:
+            for item in bids[w]["items"]:
+                sold[item] = (bids[w], payments[w] / len(bids[w]["items"]))
+
+        results = []
+        for item, auction in items.items():
+            bid, price = sold.get(item, (None, 0))
+            order = auction.items[item]
+            req = {key: value for key, value in auction.req.items() if key != "orders"}
+            results.append({**req,
+                            "winner_id": bid["carrier_id"] if bid else None,
+                            "winner": bid["carrier_id"] if bid else None,
+                            "price": price,
+                            "node_id": order["node_id"],
+                            "delivery": order["delivery"],
+                            "order_pk": order["order_pk"],
+                            "item_id": item,
+                            "bundle": bid["items"] if bid else None})
+        return results
@@ -6,5 +6,5 @@ if __name__ == "__main__":
     for _ in range(20):   # run 20 times
         model.step()
         #print(f"Finished cycle {model.tick // 5}, "
-        #      f"last winner: {model.last_auction_result.get('winner')}")
+        #      f"last winner: {[r.get('winner') for r in model.last_auction_results]}")
         #time.sleep(0.5)
@@ -0,0 +1,147 @@
+"""
+Headless batch experiments across carrier counts, cost parameters and seeds.
+
+    python -m auction.run_batch --carriers 2 3 --seeds 0 1 2 --ticks 20
+    python -m auction.run_batch --params default 1.0,1.4,2.0,1.0 --replications 50 \\
+                                --out auction/batch_results.csv
+    python -m auction.run_batch --scenario auction/scenarios/s500/scenario.json --carriers 100 500
+
+Every replication runs in a worker process on its own copy of the order
+CSVs (a temporary directory), with the in-process auctioneer and no GUI
+snapshots. One row per run is written to a single CSV. Each replication
+starts from an empty solve cache, so the seconds column does not depend
+on what ran before it.
+
+The seed seeds the model's RNG, which picks the order a carrier offers
+when no removal improves its profit, so replications differ.
+
+--params takes "default" (the scenario's own parameters) or "a1,a2,b1,b2",
+applied to every carrier. --scenario picks the carrier population
+(auction.scenario, the three default carriers if not given); a run with
+n carriers uses its first n. --metrics adds the total seconds of every
+timed phase and every counter of models.metrics to each row.
+"""
+
+import argparse
+import contextlib
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from auction.core import CarrierModel
+from auction.scenario import loadScenario
+from models import metrics, solveCache
+from models.parallel import configureExecutor
+
+
+def parse_params(label: str, n_carriers: int) -> Optional[List[tuple]]:
+    if label == "default":
+        return None
+    values = tuple(float(value) for value in label.split(","))
+    if len(values) != 4:
+        raise ValueError(f"expected a1,a2,b1,b2, got {label}")
+    return [values] * n_carriers
+
+
+def make_jobs(carrier_counts, param_labels, seeds, ticks: int, auction_mode: str,
+             scenario: Optional[str] = None, with_metrics: bool = False) -> List[Dict]:
+    available = len(loadScenario(scenario))
+    jobs = []
+    for n_carriers, label, seed in itertools.product(carrier_counts or [available], param_labels, seeds):
+        if not 1 <= n_carriers <= available:
+            raise ValueError(f"carrier count must be 1..{available}, got {n_carriers}")
+        jobs.append({"run_id": len(jobs), "n_carriers": n_carriers, "params": label,
+                     "seed": seed, "ticks": ticks, "auction_mode": auction_mode,
+                     "scenario": scenario, "metrics": with_metrics})
+    return jobs
+
+
+def run_replication(job: Dict) -> Dict:
+    """Run one model in an isolated directory and summarise it as one row."""
+    configureExecutor("serial")     # the batch pool already uses every core
+    # pool workers run many replications: start each from a cold solve
+    # cache and empty metrics, so its seconds and timings are its own
+    solveCache.SOLVE_CACHE.clear()
+    metrics.reset()
+    if job.get("metrics"):
+        metrics.enable()
+    n_carriers = job["n_carriers"]
+    scenario = loadScenario(job.get("scenario")).head(n_carriers)
+
+    with tempfile.TemporaryDirectory(prefix="ccn_run_") as workdir:
+        for spec in scenario.carriers:
+            shutil.copy(os.path.join(scenario.carriers_dir, spec.order_csv), workdir)
+
+        start = time.perf_counter()
+        with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+            model = CarrierModel(transport="inprocess", auction_mode=job["auction_mode"],
+                                 params=parse_params(job["params"], n_carriers), carriers_dir=workdir,
+                                 write_snapshots=False, seed=job["seed"], persist_every=None,
+                                 scenario=scenario)
+            before = {c.carrier_id: c.cost_model.profit_information[0] for c in model.carriers}
+            for _ in range(job["ticks"]):
+                model.step()
+            after = {c.carrier_id: c.cost_model.profit_information[0] for c in model.carriers}
+        seconds = time.perf_counter() - start
+
+    row = dict(job)
+    row.update({"profit_before_total": sum(before.values()),
+                "profit_after_total": sum(after.values()),
+                "trades": model.trades,
+                "seconds": seconds})
+    row.update({f"profit_after_{ID}": profit for ID, profit in after.items()})
+    if job.get("metrics"):
+        measured = metrics.snapshot()
+        row.update({f"seconds_{name}": t["total"] for name, t in measured["timers"].items()})
+        row.update({f"count_{name}": value for name, value in measured["counters"].items()})
+    return row
+
+
+def run_batch(jobs: List[Dict], max_workers: Optional[int] = None) -> pd.DataFrame:
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(run_replication, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows.append(future.result())
+            print(f"\r{done}/{len(jobs)} runs", end="", flush=True)
+    print()
+    results = pd.DataFrame(rows).sort_values("run_id").reset_index(drop=True)
+    results["profit_gain"] = results["profit_after_total"] - results["profit_before_total"]
+    return results
+
+
+def write_results(results: pd.DataFrame, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    results.to_csv(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default=None, help="scenario JSON (default: the three carriers)")
+    parser.add_argument("--carriers", type=int, nargs="+", default=None, help="default: all of the scenario")
+    parser.add_argument("--params", nargs="+", default=["default"])
+    parser.add_argument("--seeds", type=int, nargs="+", default=None)
+    parser.add_argument("--replications", type=int, default=1, help="seeds 0..N-1 when --seeds is not given")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--auction-mode", choices=("single", "bundle"), default="single")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metrics", action="store_true", help="per-phase timings and counters per run")
+    parser.add_argument("--out", default=os.path.join("auction", "batch_results.csv"))
+    args = parser.parse_args()
+
+    seeds = args.seeds if args.seeds is not None else range(args.replications)
+    jobs = make_jobs(args.carriers, args.params, seeds, args.ticks, args.auction_mode, args.scenario,
+                    args.metrics)
+    results = run_batch(jobs, args.workers)
+    write_results(results, args.out)
+    print(f"{len(results)} runs -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
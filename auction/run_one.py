@@ -2,8 +2,15 @@
 Run one auction simulation and write JSON meta data.
 
     python -m auction.run_one 20        # 20 ticks (≈ 10 auctions)
-
-Output file:  auction/carriers_info/_meta.json
+    python -m auction.run_one 20 0 inprocess   # no auctioneer service needed
+    python -m auction.run_one 20 0 inprocess bundle   # bundle auctions
+    python -m auction.run_one 20 0 inprocess single auction/scenarios/s100/scenario.json
+
+The run works on copies of the scenario's order CSVs in
+auction/run_output (auction.runner.RUN_OUTPUT_DIR, cleared first), where
+the GUI server picks up its snapshots.
+Output file:  _meta.json in auction/run_output, plus _metrics.json
+(per-phase timings and counters, models.metrics) when run with CCN_METRICS=1
 Schema:
 {
   "ticks": 50,
@@ -14,16 +21,21 @@ Schema:
   "finished": true
 }
 """
-import sys, json, os, time
+import sys, json, os, shutil, time
 from auction.core import CarrierModel
+from auction.runner import RUN_OUTPUT_DIR, carrier_profits, copy_orders, run_meta
+from auction.scenario import loadScenario
+from models import metrics
 
 ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
 delay  = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
-model = CarrierModel(n_carriers=3)
-
-def carrier_profits(model):
-    return {c.carrier_id: c.cost_model.profit_information[0]
-            for c in model.carriers}
+transport = sys.argv[3] if len(sys.argv) > 3 else "http"
+auction_mode = sys.argv[4] if len(sys.argv) > 4 else "single"
+scenario = loadScenario(sys.argv[5] if len(sys.argv) > 5 else None)
+shutil.rmtree(RUN_OUTPUT_DIR, ignore_errors=True)
+copy_orders(scenario, RUN_OUTPUT_DIR)
+model = CarrierModel(transport=transport, auction_mode=auction_mode, scenario=scenario,
+                     carriers_dir=RUN_OUTPUT_DIR)
 
 profit_before = carrier_profits(model)
 
@@ -32,18 +44,13 @@ for _ in range(ticks):
     if delay:
         time.sleep(delay) #to visualize better real time route changes
 
+model.persist_orders()
 profit_after = carrier_profits(model)
-meta = {
-    "ticks": ticks,
-    "profit_before_total": round(sum(profit_before.values()), 2),
-    "profit_after_total":  round(sum(profit_after.values()),  2),
-    "profit_before": {k: round(v, 2) for k, v in profit_before.items()},
-    "profit_after":  {k: round(v, 2) for k, v in profit_after.items()},
-    "finished": True
-}
+meta = run_meta(ticks, profit_before, profit_after)
 
-os.makedirs("auction/carriers_info", exist_ok=True)
 json.dump(meta,
-          open("auction/carriers_info/_meta.json", "w"),
+          open(os.path.join(model.carriers_dir, "_meta.json"), "w"),
           indent=2)
+if metrics.enabled():
+    metrics.writeJSON(os.path.join(model.carriers_dir, "_metrics.json"), {"ticks": ticks})
 
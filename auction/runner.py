@@ -0,0 +1,173 @@
+"""
+Simulation runs inside a long-lived process (the GUI server).
+
+Imports, the node table and its distance matrix are loaded once instead
+of per run. Every submitted run gets a job ID, its own copy of the
+scenario's order CSVs, the in-process auctioneer and a SnapshotStore the
+model pushes its snapshots to. Runs share a pool of max_workers threads,
+report progress per tick and stop at the next tick once cancelled.
+
+Runs started from the command line (auction.run_one) write their orders,
+snapshots and meta to RUN_OUTPUT_DIR instead, which the GUI server
+watches; it is not tracked, so the scenario's files stay as they are.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import models.nodeUtilities as nu
+from auction.core import CarrierModel
+from auction.scenario import Scenario, loadScenario
+from auction.snapshot_store import SnapshotStore
+
+MAX_JOBS = 50       # finished jobs kept for status queries
+RUN_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_output")
+
+
+def copy_orders(scenario: Scenario, run_dir: str) -> None:
+    """Copy the scenario's order CSVs into run_dir, where a run may rewrite them."""
+    os.makedirs(run_dir, exist_ok=True)
+    for spec in scenario.carriers:
+        shutil.copy(os.path.join(scenario.carriers_dir, spec.order_csv), run_dir)
+
+
+def carrier_profits(model: CarrierModel) -> Dict[str, float]:
+    return {c.carrier_id: c.cost_model.profit_information[0]
+            for c in model.carriers}
+
+
+def run_meta(ticks: int, profit_before: Dict[str, float], profit_after: Dict[str, float],
+             finished: bool = True) -> Dict:
+    """The _meta.json schema of auction.run_one."""
+    return {
+        "ticks": ticks,
+        "profit_before_total": round(sum(profit_before.values()), 2),
+        "profit_after_total":  round(sum(profit_after.values()),  2),
+        "profit_before": {k: round(v, 2) for k, v in profit_before.items()},
+        "profit_after":  {k: round(v, 2) for k, v in profit_after.items()},
+        "finished": finished
+    }
+
+
+class Job:
+    def __init__(self, job_id: str, scenario: Scenario, ticks: int, delay: float,
+                 auction_mode: str, transport: str):
+        self.job_id = job_id
+        self.scenario = scenario
+        self.ticks = ticks
+        self.delay = delay
+        self.auction_mode = auction_mode
+        self.transport = transport
+        self.status = "queued"      # queued / running / finished / cancelled / failed
+        self.tick = 0
+        self.meta: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.store = SnapshotStore()
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "cancelled", "failed")
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish("cancelled")
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.store.update(meta={**(self.meta or {}), "finished": True, "running": False, "status": status})
+
+    def info(self) -> Dict:
+        return {"job_id": self.job_id,
+                "status": self.status,
+                "tick": self.tick,
+                "ticks": self.ticks,
+                "progress": round(self.tick / self.ticks, 3) if self.ticks else 1.0,
+                "carriers": len(self.scenario),
+                "auction_mode": self.auction_mode,
+                "meta": self.meta,
+                "error": self.error}
+
+
+class SimulationRunner:
+    def __init__(self, max_workers: int = 2, warm_scenario: Optional[Scenario] = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simulation")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.warm(warm_scenario or loadScenario())
+
+    @staticmethod
+    def warm(scenario: Scenario) -> None:
+        """Load the scenario's node table and distance matrix ahead of the first run."""
+        nu.getNodeRegistry(scenario.node_file).distanceMatrix()
+
+    # ── jobs ────────────────────────────────────────────────────────────
+    def submit(self, scenario_path: Optional[str] = None, ticks: int = 20, delay: float = 0.0,
+               auction_mode: str = "single", transport: str = "inprocess") -> Job:
+        job = Job(f"J{next(self._ids)}", loadScenario(scenario_path), ticks, delay, auction_mode, transport)
+        job.store.update(meta={"running": True, "status": job.status})
+        with self._lock:
+            self._jobs[job.job_id] = job
+            finished = [ID for ID, old in self._jobs.items() if old.done]
+            for ID in finished[:max(len(self._jobs) - MAX_JOBS, 0)]:
+                del self._jobs[ID]
+        job.future = self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self) -> Optional[Job]:
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self) -> None:
+        for job in self.jobs():
+            job.cancel()
+        self._pool.shutdown(wait=True)
+
+    # ── one run ─────────────────────────────────────────────────────────
+    def _run(self, job: Job) -> None:
+        if job._cancel.is_set():
+            job._finish("cancelled")
+            return
+        job.status = "running"
+        job.store.update(meta={"status": job.status})
+        try:
+            with tempfile.TemporaryDirectory(prefix="ccn_job_") as workdir:
+                copy_orders(job.scenario, workdir)
+                model = CarrierModel(transport=job.transport, auction_mode=job.auction_mode,
+                                     scenario=job.scenario, carriers_dir=workdir,
+                                     write_snapshots=False, persist_every=None)
+                model.snapshot_listeners.append(lambda tick, delta: job.store.update(delta))
+                model.emit_snapshots()              # the starting routes
+                profit_before = carrier_profits(model)
+                for _ in range(job.ticks):
+                    if job._cancel.is_set():
+                        break
+                    model.step()
+                    job.tick += 1
+                    if job.delay and job._cancel.wait(job.delay):
+                        break
+                model.auctioneer_client.close()
+                job.meta = run_meta(job.tick, profit_before, carrier_profits(model))
+        except Exception:
+            job.error = traceback.format_exc()
+            job._finish("failed")
+            return
+        job._finish("cancelled" if job._cancel.is_set() else "finished")
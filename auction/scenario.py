@@ -0,0 +1,240 @@
+"""
+Carrier populations: who takes part, where their depots are, how they price.
+
+A scenario is a JSON file
+
+    {
+      "node_file": "nodes.csv",
+      "carriers_dir": ".",
+      "carriers": [
+        {"carrier_id": "C0", "depot_id": "W0", "depot": [-40, -290],
+         "params": [1.0, 1.4, 2.0, 1.0], "order_csv": "orderC0.csv"},
+        ...
+      ]
+    }
+
+with relative paths taken from the file's directory. Every depot_id must
+be a node of node_file. defaultScenario() is the original three-carrier
+set-up (PARAMS, DEPOTS, nodeInfoFromGUI.csv, auction/carriers_info), and
+generateScenario() writes a synthetic one of any size:
+
+    python -m auction.scenario --carriers 500 --orders 5 --out auction/scenarios/s500
+    python -m auction.run_batch --scenario auction/scenarios/s500/scenario.json --carriers 100 500
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import models.nodeUtilities as nu
+from models.costModelBasedOnOrder import PATH_CARRIERS_INFO
+from models.orderBook import OrderBook
+from models.pickupDelivery import solve_PnD
+from models.solverConfig import DEFAULT_CONFIG, SolverConfig
+
+# quick param table  (a1, a2, b1, b2) per carrier
+PARAMS = [
+    (1.0, 1.4, 2.0, 1.0),
+    (1.5, 1.2, 1.9, 1.0),
+    (0.9, 1.4, 2.9, 0.9),
+]
+
+# warehouse (x, y) per carrier
+DEPOTS = [
+    (-40, -290),
+    (-170, 200),
+    (110, 200),
+]
+
+DEFAULT_NODE_FILE = "nodeInfoFromGUI.csv"
+
+# ranges the generator draws (a1, a2, b1, b2) from, spanning PARAMS
+PARAM_RANGES = [(0.9, 1.5), (1.2, 1.4), (1.9, 2.9), (0.9, 1.0)]
+# share of max_route_distance a generated starting route is sized for,
+# the rest is room to buy orders; and how often a carrier's orders are
+# redrawn before the generator gives up on a book that does not solve
+START_ROUTE_SHARE = 0.35
+MAX_DRAWS = 20
+
+
+class CarrierSpec(NamedTuple):
+    carrier_id: str
+    depot_id: str
+    depot: Tuple[float, float]
+    params: Tuple[float, float, float, float]
+    order_csv: str
+
+    @classmethod
+    def fromDict(cls, spec: Dict) -> "CarrierSpec":
+        carrier_id = spec["carrier_id"]
+        return cls(carrier_id, spec["depot_id"], tuple(spec["depot"]), tuple(spec["params"]),
+                   spec.get("order_csv", f"order{carrier_id}.csv"))
+
+    def toDict(self) -> Dict:
+        return {"carrier_id": self.carrier_id, "depot_id": self.depot_id, "depot": list(self.depot),
+                "params": list(self.params), "order_csv": self.order_csv}
+
+
+class Scenario:
+    def __init__(self, carriers: Sequence[CarrierSpec], node_file: str = DEFAULT_NODE_FILE,
+                 carriers_dir: str = PATH_CARRIERS_INFO):
+        self.carriers = list(carriers)
+        self.node_file = node_file          # name under models/input, or a path
+        self.carriers_dir = carriers_dir
+        ids = [spec.carrier_id for spec in self.carriers]
+        if len(set(ids)) != len(ids):
+            raise ValueError("carrier IDs must be unique")
+
+    def __len__(self) -> int:
+        return len(self.carriers)
+
+    # ── derived scenarios ───────────────────────────────────────────────
+    def head(self, n_carriers: int) -> "Scenario":
+        """The first n_carriers carriers."""
+        if not 1 <= n_carriers <= len(self):
+            raise ValueError(f"{n_carriers} carriers but only {len(self)} configured")
+        return Scenario(self.carriers[:n_carriers], self.node_file, self.carriers_dir)
+
+    def withParams(self, params: Sequence[tuple]) -> "Scenario":
+        """One (a1, a2, b1, b2) per carrier, in order."""
+        if len(params) < len(self):
+            raise ValueError(f"{len(self)} carriers but only {len(params)} parameter sets")
+        return Scenario([spec._replace(params=tuple(p)) for spec, p in zip(self.carriers, params)],
+                        self.node_file, self.carriers_dir)
+
+    def withCarriersDir(self, carriers_dir: str) -> "Scenario":
+        return Scenario(self.carriers, self.node_file, carriers_dir)
+
+    # ── persistence ─────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        base = os.path.dirname(os.path.abspath(path))
+        with open(path) as f:
+            data = json.load(f)
+        node_file = data.get("node_file", DEFAULT_NODE_FILE)
+        if os.path.dirname(node_file):
+            node_file = os.path.join(base, node_file)
+        elif os.path.exists(os.path.join(base, node_file)):
+            node_file = os.path.join(base, node_file)
+        return cls([CarrierSpec.fromDict(spec) for spec in data["carriers"]], node_file,
+                   os.path.normpath(os.path.join(base, data.get("carriers_dir", "."))))
+
+    def save(self, path: str) -> None:
+        base = os.path.dirname(os.path.abspath(path))
+        node_file = self.node_file
+        if os.path.isabs(node_file):
+            node_file = os.path.relpath(node_file, base)
+        with open(path, "w") as f:
+            json.dump({"node_file": node_file,
+                       "carriers_dir": os.path.relpath(self.carriers_dir, base),
+                       "carriers": [spec.toDict() for spec in self.carriers]}, f, indent=2)
+
+
+def defaultScenario(params: Optional[Sequence[tuple]] = None,
+                    carriers_dir: str = PATH_CARRIERS_INFO) -> Scenario:
+    """The three carriers of auction/carriers_info."""
+    params = params or PARAMS
+    n_carriers = min(len(params), len(DEPOTS))
+    return Scenario([CarrierSpec(f"C{i}", f"W{i}", DEPOTS[i], tuple(params[i]), f"orderC{i}.csv")
+                     for i in range(n_carriers)], DEFAULT_NODE_FILE, carriers_dir)
+
+
+def loadScenario(path: Optional[str] = None) -> Scenario:
+    """The scenario in path, the default one if None."""
+    return Scenario.load(path) if path else defaultScenario()
+
+
+# ──────────────────────────────────────────────────────────────────────
+# synthetic populations
+# ──────────────────────────────────────────────────────────────────────
+def generateScenario(out_dir: str, n_carriers: int, orders_per_carrier: int = 5,
+                     n_nodes: Optional[int] = None, extent: Optional[int] = None,
+                     neighbourhood: int = 20, seed: int = 0,
+                     config: Optional[SolverConfig] = None, validate: bool = True) -> Scenario:
+    """
+    Write nodes.csv, one order CSV per carrier and scenario.json to out_dir.
+
+    Depots W0..W{n-1} and n_nodes shared customer nodes (default 2 per
+    carrier, at least 30) are spread uniformly over [-extent, extent]².
+    A carrier's orders run between its depot's neighbourhood nearest
+    customer nodes, so neighbouring carriers overlap and have something
+    to trade. Order IDs are unique across the population.
+
+    extent defaults to a size at which a starting route (legs of about
+    half the extent) takes START_ROUTE_SHARE of the carriers' route
+    distance limit (config, default the model's single truck). With
+    validate, every carrier's book is solved under that config and
+    redrawn until it solves; ValueError after MAX_DRAWS tries.
+    """
+    rng = random.Random(seed)
+    config = config or DEFAULT_CONFIG
+    n_nodes = n_nodes or max(30, 2 * n_carriers)
+    neighbourhood = max(2, min(neighbourhood, n_nodes))
+    extent = extent or int(START_ROUTE_SHARE * config.max_route_distance / (0.5 * (2 * orders_per_carrier + 1)))
+    os.makedirs(out_dir, exist_ok=True)
+
+    def point() -> Tuple[int, int]:
+        return rng.randint(-extent, extent), rng.randint(-extent, extent)
+
+    depots = [point() for _ in range(n_carriers)]
+    customers = [point() for _ in range(n_nodes)]
+    width = len(str(n_nodes - 1))
+    customer_ids = [f"N{k:0{width}d}" for k in range(n_nodes)]
+
+    with open(os.path.join(out_dir, "nodes.csv"), "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Node_ID", "Node_Name", "x", "y"])
+        w.writerows([f"W{i}", f"Warehouse{i}", x, y] for i, (x, y) in enumerate(depots))
+        w.writerows([ID, f"Customer{k}", x, y] for k, (ID, (x, y)) in enumerate(zip(customer_ids, customers)))
+
+    node_table = nu.getNodeRegistry(os.path.abspath(os.path.join(out_dir, "nodes.csv"))) if validate else None
+    carriers = []
+    order_width = len(str(n_carriers * orders_per_carrier))
+    next_order = 1
+    for i, (dx, dy) in enumerate(depots):
+        near = sorted(range(n_nodes), key=lambda k: math.hypot(customers[k][0] - dx, customers[k][1] - dy))
+        near = near[:neighbourhood]
+        for _ in range(MAX_DRAWS):
+            orders = []
+            for k in range(orders_per_carrier):
+                pickup, delivery = rng.sample(near, 2)
+                orders.append((f"O{next_order + k:0{order_width}d}", customer_ids[pickup], customer_ids[delivery]))
+            if node_table is None or solve_PnD(orders, node_table, f"W{i}", use_cache=False, config=config):
+                break
+        else:
+            raise ValueError(f"no solvable orders for W{i} in {MAX_DRAWS} draws, "
+                             f"try a smaller extent than {extent}")
+        next_order += orders_per_carrier
+        spec = CarrierSpec(f"C{i}", f"W{i}", (dx, dy),
+                           tuple(round(rng.uniform(lo, hi), 2) for lo, hi in PARAM_RANGES),
+                           f"orderC{i}.csv")
+        OrderBook(orders).save(os.path.join(out_dir, spec.order_csv))
+        carriers.append(spec)
+
+    scenario = Scenario(carriers, os.path.join(os.path.abspath(out_dir), "nodes.csv"), os.path.abspath(out_dir))
+    scenario.save(os.path.join(out_dir, "scenario.json"))
+    return scenario
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic carrier population.")
+    parser.add_argument("--carriers", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=5, help="orders per carrier")
+    parser.add_argument("--nodes", type=int, default=None, help="customer nodes (default 2 per carrier)")
+    parser.add_argument("--extent", type=int, default=None,
+                        help="half-width of the area (default: sized to the route distance limit)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join("auction", "scenarios", f"s{args.carriers}")
+    generateScenario(out_dir, args.carriers, args.orders, args.nodes, args.extent, seed=args.seed)
+    print(f"{args.carriers} carriers -> {os.path.join(out_dir, 'scenario.json')}")
+
+
+if __name__ == "__main__":
+    main()
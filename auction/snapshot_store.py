@@ -0,0 +1,125 @@
+"""
+Latest carrier snapshots for the GUI, kept in memory and versioned.
+
+A run appends its snapshot deltas to SNAPSHOT_LOG in its carriers
+directory (auction.core). refresh() tails that file from the offset it
+last read, and re-reads _meta.json only when it changed, instead of
+parsing every *_vrp.json per request. Every change bumps one version
+number: pollers compare it (the server's ETag), streaming clients block
+in wait() until it moves past theirs and get only the carriers that
+changed since.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_LOG = "_snapshots.ndjson"
+HISTORY = 256       # versions kept for deltas; older clients get the full state
+
+
+class SnapshotStore:
+    def __init__(self, carriers_dir: Optional[str] = None):
+        self._cond = threading.Condition()
+        self.version = 0
+        self._history: deque = deque(maxlen=HISTORY)     # (version, changed IDs, meta changed)
+        self.reset(carriers_dir)
+
+    def reset(self, carriers_dir: Optional[str] = None) -> None:
+        """Forget everything, e.g. when a new run starts."""
+        with self._cond:
+            self.carriers_dir = carriers_dir
+            self._order: List[str] = []
+            self._snapshots: Dict[str, Dict] = {}
+            self._meta: Dict = {}
+            self._log_offset = 0
+            self._meta_mtime = None
+            self._bump(None, True)
+
+    # ── updates ─────────────────────────────────────────────────────────
+    def _bump(self, changed: Optional[set], meta_changed: bool) -> int:
+        # changed None = everything
+        self.version += 1
+        self._history.append((self.version, changed, meta_changed))
+        self._cond.notify_all()
+        return self.version
+
+    def update(self, carriers: Optional[Dict[str, Dict]] = None, meta: Optional[Dict] = None) -> int:
+        """Merge carrier snapshots and meta fields; returns the new version."""
+        with self._cond:
+            carriers = carriers or {}
+            for ID, snapshot in carriers.items():
+                if ID not in self._snapshots and ID not in self._order:
+                    self._order.append(ID)
+                self._snapshots[ID] = snapshot
+            if meta:
+                self._meta.update(meta)
+            if not carriers and not meta:
+                return self.version
+            return self._bump(set(carriers), bool(meta))
+
+    def refresh(self) -> int:
+        """Pick up what the run wrote to carriers_dir since the last call."""
+        if self.carriers_dir is None:
+            return self.version
+        index_path = os.path.join(self.carriers_dir, "_carriers.json")
+        if not self._order and os.path.exists(index_path):
+            with open(index_path) as f, self._cond:
+                self._order = list(json.load(f)["carriers"])
+
+        log_path = os.path.join(self.carriers_dir, SNAPSHOT_LOG)
+        if os.path.exists(log_path):
+            if os.path.getsize(log_path) < self._log_offset:        # a new run truncated it
+                self.reset(self.carriers_dir)
+                return self.refresh()
+            with open(log_path, "rb") as f:
+                f.seek(self._log_offset)
+                chunk = f.read()
+            complete = chunk[:chunk.rfind(b"\n") + 1]               # leave a half-written line
+            self._log_offset += len(complete)
+            changed = {}
+            for line in complete.splitlines():
+                if line.strip():
+                    changed.update(json.loads(line)["carriers"])
+            if changed:
+                self.update(changed)
+
+        meta_path = os.path.join(self.carriers_dir, "_meta.json")
+        if os.path.exists(meta_path):
+            mtime = os.stat(meta_path).st_mtime_ns
+            if mtime != self._meta_mtime:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                self._meta_mtime = mtime
+                self.update(meta=meta)
+        return self.version
+
+    # ── reads ───────────────────────────────────────────────────────────
+    def state(self) -> Tuple[int, List[Dict], Dict]:
+        """(version, one snapshot per carrier in run order ({} if none yet), meta)."""
+        with self._cond:
+            return self.version, [self._snapshots.get(ID, {}) for ID in self._order], dict(self._meta)
+
+    def changes_since(self, version: int) -> Optional[Dict]:
+        """
+        {"version", "full", "carriers": {ID: snapshot}, "meta"} for what changed
+        after version, None if nothing did. full means carriers is everything.
+        """
+        with self._cond:
+            if version >= self.version:
+                return None
+            newer = [entry for entry in self._history if entry[0] > version]
+            full = newer[0][0] != version + 1 or any(changed is None for _, changed, _ in newer)
+            IDs = self._order if full else {ID for _, changed, _ in newer for ID in changed}
+            return {"version": self.version,
+                    "full": full,
+                    "carriers": {ID: self._snapshots[ID] for ID in IDs if ID in self._snapshots},
+                    "meta": dict(self._meta)}
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> Optional[Dict]:
+        """changes_since(version), blocking up to timeout seconds for there to be some."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > version, timeout)
+            return self.changes_since(version)
@@ -0,0 +1,52 @@
+"""
+Compare the native matrix arc evaluator with the Python callback.
+
+    python -m benchmarks.arc_evaluator --orders 10 25 50 --repeats 3
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from models.node import Node
+from models.nodeUtilities import NodeRegistry
+from models.pickupDelivery import solve_PnD
+
+
+def synthetic_problem(n_orders: int, seed: int = 0):
+    rng = random.Random(seed)
+    nodes = [Node("W0", "Warehouse0", 0, 0)]
+    nodes += [Node(f"N{i:04}", f"Node{i}", rng.randint(-100, 100), rng.randint(-100, 100))
+              for i in range(2 * n_orders)]
+    orders = [[f"O{i:04}", f"N{2*i:04}", f"N{2*i+1:04}"] for i in range(n_orders)]
+    return orders, NodeRegistry(nodes)
+
+
+def time_solve(orders, node_table, arc_evaluator: str, time_limit: float) -> tuple:
+    start = time.perf_counter()
+    result = solve_PnD(orders, node_table, "W0", time_limit=time_limit,
+                       use_cache=False, arc_evaluator=arc_evaluator)
+    # None: no route within the default distance limit
+    return time.perf_counter() - start, sum(result["distance"]) if result else float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="seconds per solve (default: until local search converges)")
+    args = parser.parse_args()
+
+    print(f"{'orders':>6} {'evaluator':>9} {'median s':>9} {'distance':>9}")
+    for n_orders in args.orders:
+        orders, node_table = synthetic_problem(n_orders)
+        node_table.distanceMatrix()     # build the .npy cache outside the timing
+        for arc_evaluator in ("callback", "matrix"):
+            runs = [time_solve(orders, node_table, arc_evaluator, args.time_limit) for _ in range(args.repeats)]
+            print(f"{n_orders:>6} {arc_evaluator:>9} {statistics.median(r[0] for r in runs):>9.3f} {runs[0][1]:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Latency and throughput of the solver, the cost model and a full auction
+tick on synthetic scenarios (auction.scenario.generateScenario).
+
+    python -m benchmarks.suite --carriers 3 10 --orders 5 10 --repeats 5
+    python -m benchmarks.suite --carriers 100 --orders 5 --ticks 10 --cases solve model_step --budget 120
+    python -m benchmarks.suite --compare benchmarks/results/bench-abc123.json benchmarks/results/bench-def456.json
+
+Cases, run for every (carriers, orders per carrier, customer nodes):
+
+    solve            solve_PnD of one carrier's orders
+    cost_model       CostModel construction (solve + removal vectors)
+    invalidate       CostModel.invalidate() after an order is added
+    profit_if_added  pricing another carrier's order
+    model_step       one CarrierModel.step, in-process auctioneer
+
+Each case reports p50/p90/p99/max seconds, operations per second, the
+process's peak resident memory (getrusage ru_maxrss, so OR-Tools' native
+allocations count) and how much that peak grew during the case. The peak
+is a high-water mark for the whole run: a case only shows growth when it
+needs more memory than everything before it. A case stops issuing
+operations once it has spent --budget seconds (one operation always
+runs, and a running one is not interrupted: a 100-carrier tick with
+trades can take minutes); the skipped count is reported. The solve cache is cleared before
+every operation unless --warm-cache is given. Results go to a JSON file
+named after the commit, which --compare reads back.
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import models.nodeUtilities as nu
+from auction.core import CarrierModel
+from auction.scenario import generateScenario
+from models.costModelBasedOnOrder import CostModel
+from models.orderBook import Order, OrderBook
+from models.parallel import configureExecutor
+import models.solveCache as solveCache
+from models.pickupDelivery import solve_PnD
+
+CASES = ("solve", "cost_model", "invalidate", "profit_if_added", "model_step")
+PATH_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+# ──────────────────────────────────────────────────────────────────────
+# measuring
+# ──────────────────────────────────────────────────────────────────────
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]."""
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process; ru_maxrss is bytes on macOS, KiB elsewhere."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def measure(operations: List[Callable[[], object]], warm_cache: bool,
+            budget: Optional[float] = None) -> Dict:
+    """Time each operation once, until the budget (seconds) is spent."""
+    latencies = []
+    peak_before = peak_rss_mb()
+    for operation in operations:
+        if latencies and budget is not None and sum(latencies) >= budget:
+            break
+        if not warm_cache:
+            # through the module: configureSolveCache replaces SOLVE_CACHE
+            solveCache.SOLVE_CACHE.clear()
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    peak = peak_rss_mb()
+
+    latencies.sort()
+    return {"count": len(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1],
+            "mean": sum(latencies) / len(latencies),
+            "per_second": len(latencies) / sum(latencies) if sum(latencies) else float("inf"),
+            "peak_mb": peak,
+            "peak_growth_mb": peak - peak_before,
+            "skipped": len(operations) - len(latencies)}
+
+
+# ──────────────────────────────────────────────────────────────────────
+# cases
+# ──────────────────────────────────────────────────────────────────────
+def _cost_model(spec, scenario, books) -> CostModel:
+    return CostModel(*spec.params, spec.order_csv, f"travelMatrix{spec.carrier_id}.csv",
+                     depot_id=spec.depot_id, node_file=scenario.node_file,
+                     carriers_dir=scenario.carriers_dir,
+                     order_book=books[spec.carrier_id], order_books=books)
+
+
+def case_operations(case: str, scenario, books: Dict[str, OrderBook], rng: random.Random,
+                    repeats: int, ticks: int) -> List[Callable[[], object]]:
+    specs = [rng.choice(scenario.carriers) for _ in range(repeats)]
+    node_table = nu.getNodeRegistry(scenario.node_file)
+
+    if case == "solve":
+        return [lambda spec=spec: solve_PnD(books[spec.carrier_id].rows(), node_table, spec.depot_id,
+                                            use_cache=False)
+                for spec in specs]
+
+    if case == "cost_model":
+        return [lambda spec=spec: _cost_model(spec, scenario, books) for spec in specs]
+
+    if case == "invalidate":
+        operations = []
+        for spec in specs:
+            model = _cost_model(spec, scenario, books)
+            seller = rng.choice([other for other in scenario.carriers if other is not spec] or [spec])
+            bought = rng.choice(books[seller.carrier_id].rows())
+
+            def operation(model=model, bought=bought):
+                book = model.order_book
+                book.add(Order(f"bench-{bought.order_pk}", bought.pickup, bought.delivery))
+                try:
+                    model.invalidate()
+                finally:
+                    book.remove(f"bench-{bought.order_pk}")
+            operations.append(operation)
+        return operations
+
+    if case == "profit_if_added":
+        operations = []
+        for spec in specs:
+            model = _cost_model(spec, scenario, books)
+            seller = rng.choice([other for other in scenario.carriers if other is not spec] or [spec])
+            offered = rng.choice(books[seller.carrier_id].rows())
+            operations.append(lambda model=model, seller=seller, offered=offered:
+                              model.profitIfAdded(seller.carrier_id, offered.pickup, offered.delivery))
+        return operations
+
+    if case == "model_step":
+        with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+            model = CarrierModel(transport="inprocess", scenario=scenario, write_snapshots=False,
+                                 persist_every=None, seed=rng.randrange(2**31))
+
+        def step():
+            with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+                model.step()
+        return [step for _ in range(ticks)]
+
+    raise ValueError(f"unknown case: {case}")
+
+
+def run_suite(carrier_counts, order_counts, node_counts, cases, repeats: int, ticks: int,
+              seed: int, warm_cache: bool, budget: Optional[float] = None) -> List[Dict]:
+    rows = []
+    for n_carriers, n_orders, n_nodes in itertools.product(carrier_counts, order_counts, node_counts):
+        with tempfile.TemporaryDirectory(prefix="ccn_bench_") as workdir:
+            scenario = generateScenario(workdir, n_carriers, n_orders, n_nodes, seed=seed)
+            nu.getNodeRegistry(scenario.node_file).distanceMatrix()     # .npy cache outside the timings
+            for case in cases:
+                # fresh order books per case: model_step trades, invalidate edits
+                books = {spec.carrier_id: OrderBook.load(os.path.join(workdir, spec.order_csv))
+                         for spec in scenario.carriers}
+                run_dir = os.path.join(workdir, case)
+                os.makedirs(run_dir)
+                for spec in scenario.carriers:
+                    shutil.copy(os.path.join(workdir, spec.order_csv), run_dir)
+                operations = case_operations(case, scenario.withCarriersDir(run_dir), books,
+                                             random.Random(seed), repeats, ticks)
+                row = {"carriers": n_carriers, "orders": n_orders,
+                       "nodes": len(nu.getNodeRegistry(scenario.node_file)) - n_carriers,
+                       "case": case, **measure(operations, warm_cache, budget)}
+                rows.append(row)
+                print(f"{n_carriers:>8} {n_orders:>6} {row['nodes']:>6} {case:>16} "
+                      f"{row['p50']:>9.4f} {row['p99']:>9.4f} {row['per_second']:>9.1f} "
+                      f"{row['peak_mb']:>8.1f} {row['peak_growth_mb']:>8.1f} {row['skipped']:>7}")
+    return rows
+
+
+# ──────────────────────────────────────────────────────────────────────
+# results
+# ──────────────────────────────────────────────────────────────────────
+def commit_id() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(rows: List[Dict], args: argparse.Namespace, path: Optional[str] = None) -> str:
+    commit = commit_id()
+    path = path or os.path.join(PATH_RESULTS, f"bench-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": {"commit": commit,
+                            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                            "python": platform.python_version(),
+                            "platform": platform.platform(),
+                            "args": {key: value for key, value in vars(args).items() if key != "compare"}},
+                   "results": rows}, f, indent=2)
+    return path
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """p50 and throughput of every case present in both files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def keyed(results):
+        return {(r["carriers"], r["orders"], r["nodes"], r["case"]): r for r in results["results"]}
+    old_rows, new_rows = keyed(old), keyed(new)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'carriers':>8} {'orders':>6} {'nodes':>6} {'case':>16} {'old p50':>9} {'new p50':>9} {'speed-up':>8}")
+    for key in sorted(old_rows.keys() & new_rows.keys()):
+        before, after = old_rows[key]["p50"], new_rows[key]["p50"]
+        print(f"{key[0]:>8} {key[1]:>6} {key[2]:>6} {key[3]:>16} {before:>9.4f} {after:>9.4f} "
+              f"{before / after if after else float('inf'):>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--carriers", type=int, nargs="+", default=[3, 10])
+    parser.add_argument("--orders", type=int, nargs="+", default=[5, 10], help="orders per carrier")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[None],
+                        help="customer nodes (default 2 per carrier, at least 30)")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=10, help="operations timed per case")
+    parser.add_argument("--ticks", type=int, default=10, help="model steps timed in model_step")
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="seconds per case before its remaining operations are skipped")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm-cache", action="store_true", help="keep the solve cache between operations")
+    parser.add_argument("--executor", choices=("process", "thread", "serial"), default="serial",
+                        help="models.parallel executor for the cost model's re-solves")
+    parser.add_argument("--out", default=None, help="default benchmarks/results/bench-<commit>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    configureExecutor(args.executor)
+    print(f"{'carriers':>8} {'orders':>6} {'nodes':>6} {'case':>16} {'p50 s':>9} {'p99 s':>9} {'ops/s':>9} "
+          f"{'peak MB':>8} {'grew MB':>8} {'skipped':>7}")
+    rows = run_suite(args.carriers, args.orders, args.nodes, args.cases, args.repeats, args.ticks,
+                     args.seed, args.warm_cache, args.budget)
+    print(f"-> {write_results(rows, args, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
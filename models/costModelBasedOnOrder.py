@@ -1,8 +1,15 @@
 import os
 import csv
-from typing import List
+import itertools
+from typing import List, Mapping, Optional, Sequence, Tuple
 
-from models.pickupDelivery import solve_PnD_problem
+import models.nodeUtilities as nu
+from models import metrics
+from models.orderBook import OrderBook
+from models.parallel import solveMany
+from models.pickupDelivery import InfeasibleRouteError, read_orders, solve_PnD
+from models.routeDelta import cheapestInsertion, insertOrder, removalSavings, stopLoads
+from models.solverConfig import DEFAULT_CONFIG, SolverConfig
 
 # project-relative paths ------------------------------------------------
 PATH_MODELS       = os.path.dirname(os.path.abspath(__file__))
@@ -21,59 +28,117 @@ class CostModel:
         distance_information[i] … distance if order-i removed
         cost_information[i]      … cost saved if order-i removed
         profit_information[i]    … profit if order-i removed
+    Removal distances are spliced out of the current route in O(1) each;
+    confirm_top_k > 0 re-solves the k most promising removals in full
+    (None = every order), fanned out over models.parallel.
+    Added orders are priced by cheapest insertion into the current route,
+    at the cheapest position that keeps the route within solver_config's
+    distance, capacity and time-window limits (none → not worth a bid);
+    orders already bid on can be inserted first (pending), so concurrent
+    wins still fit together. Bids within refine_margin of zero are
+    re-checked with a full solve.
+    Bundles of orders are priced by inserting their pairs one after the
+    other, each within the same limits (bundleValues).
+    Refreshes warm-start from the previous route, each search capped at
+    solve_time_limit seconds (None = until the local search converges).
+    solver_config describes the carrier's fleet (None = a single truck).
+    Order CSVs live in carriers_dir (default auction/carriers_info); with
+    an order_book the orders come from memory instead, and order_books
+    (carrier ID → OrderBook) replaces reading the sellers' CSVs. Node IDs
+    resolve in node_file (a name under models/input, or a path).
     """
 
     # ──────────────────────────────────────────────────────────────────
     # constructor
     # ──────────────────────────────────────────────────────────────────
-    def __init__(self, _a1, _a2, _b1, _b2, file_order, file_travelMatrix):
+    def __init__(self, _a1, _a2, _b1, _b2, file_order, file_travelMatrix,
+                 confirm_top_k: int = 0, refine_margin: float = 0.0,
+                 depot_id: str = "W0", solve_time_limit: float = None,
+                 solver_config: SolverConfig = None, carriers_dir: str = PATH_CARRIERS_INFO,
+                 order_book: Optional[OrderBook] = None,
+                 order_books: Optional[Mapping[str, OrderBook]] = None,
+                 node_file: str = "nodeInfoFromGUI.csv"):
         self.a1 = _a1
         self.a2 = _a2
         self.b1 = _b1
         self.b2 = _b2
+        self.confirm_top_k = confirm_top_k
+        self.refine_margin = refine_margin
+        self.depot_id      = depot_id
+        self.solve_time_limit = solve_time_limit
+        self.solver_config    = solver_config
+        self.carriers_dir     = carriers_dir
+        self.order_book       = order_book
+        self.order_books      = order_books
+        self.node_file        = node_file
 
         # absolute paths to CSVs
-        self.path_order         = os.path.join(PATH_CARRIERS_INFO, file_order)
-        self.path_travel_matrix = os.path.join(PATH_CARRIERS_INFO, file_travelMatrix)
+        self.path_order         = os.path.join(carriers_dir, file_order)
+        self.path_travel_matrix = os.path.join(carriers_dir, file_travelMatrix)
 
         # cached metrics
+        self.solution              = None
+        self.solution              = self.solveCurrent()
         self.revenue               = self.rj()
         self.distance_information  = self.distanceWithoutEachOrder()
         self.cost_information      = self.cj()
         self.profit_information    = self.pj()
 
+    # ──────────────────────────────────────────────────────────────────
+    # solve the route for the current orders once per refresh
+    # ──────────────────────────────────────────────────────────────────
+    @metrics.timed("cost_model.solve_current")
+    def solveCurrent(self) -> dict:
+        """
+        Solve the current orders; InfeasibleRouteError if no route keeps to
+        the solver config, with orders and solution left as they were.
+        """
+        orders          = self.order_book.rows() if self.order_book is not None else read_orders(self.path_order)
+        self.node_table = nu.getNodeRegistry(self.node_file)
+        previous        = self.solution["route_map_ID"] if self.solution else None
+        solution        = solve_PnD(orders, self.node_table, self.depot_id,
+                                    previous, self.solve_time_limit, config=self.solver_config)
+        if solution is None:
+            raise InfeasibleRouteError(
+                f"no route from {self.depot_id} serves its {len(orders)} orders "
+                f"within the solver config's limits")
+        self.orders     = orders
+        self.solution   = solution
+        return self.solution
+
     # ──────────────────────────────────────────────────────────────────
     # revenue with *all* current orders
     # ──────────────────────────────────────────────────────────────────
     def rj(self) -> float:
-        dist_all = sum(solve_PnD_problem(self.path_order, self.path_travel_matrix)["distance"])
+        dist_all = sum(self.solution["distance"])
         self.revenue = self.a1 + self.a2 * dist_all
         return self.revenue
 
     # ──────────────────────────────────────────────────────────────────
     # distance if EACH order were removed once
     # ──────────────────────────────────────────────────────────────────
+    @metrics.timed("cost_model.removal_distances")
     def distanceWithoutEachOrder(self) -> List[float]:
-        with open(self.path_order) as f:
-            list_of_orders = list(csv.reader(f))[1:]          # skip header
-
         # baseline
-        base_dist = sum(solve_PnD_problem(self.path_order,
-                                          self.path_travel_matrix)["distance"])
-        distances = [base_dist]
-
-        # loop over orders, write tmp CSV without that row, re-solve
-        for idx in range(len(list_of_orders)):
-            tmp_orders = list_of_orders[:idx] + list_of_orders[idx + 1:]
-            tmp_path   = os.path.join(PATH_CARRIERS_INFO, "tmp_rm.csv")
-            with open(tmp_path, "w", newline="") as tf:
-                w = csv.writer(tf)
-                w.writerow(["Order ID(pk)", "pickup", "delivery"])
-                w.writerows(tmp_orders)
-
-            dist = sum(solve_PnD_problem(tmp_path,
-                                          self.path_travel_matrix)["distance"])
-            distances.append(dist)
+        base_dist = sum(self.solution["distance"])
+
+        # splice each order out of the current route
+        savings = removalSavings(self.solution["route_map_ID"],
+                                 [(row[1], row[2]) for row in self.orders],
+                                 self.node_table.distance)
+        distances = [base_dist] + [base_dist - saving for saving in savings]
+
+        # confirm the k biggest savings with a full re-solve; the spliced
+        # route stays feasible, so keep whichever distance is shorter
+        top_k = sorted(range(len(savings)), key=lambda i: savings[i], reverse=True)[:self.confirm_top_k]
+        results = solveMany([
+            {"orders": self.orders[:idx] + self.orders[idx + 1:],
+             "node_table": self.node_table, "depot_id": self.depot_id, "config": self.solver_config}
+            for idx in top_k
+        ])
+        for idx, result in zip(top_k, results):
+            if result is not None:
+                distances[idx + 1] = min(distances[idx + 1], sum(result["distance"]))
 
         self.distance_information = distances
         return distances
@@ -105,58 +170,157 @@ class CostModel:
     # pickup_id & seller_id identify the row in seller‘s CSV.
     # Returns Δ(delta)profit  (>0   → worthwhile to bid)
     # ──────────────────────────────────────────────────────────────────
-    def profit_if_added(self, seller_id: str, pickup_id: str, delivery_id: str) -> float:
+    @metrics.timed("cost_model.profit_if_added")
+    def profitIfAdded(self, seller_id: str, pickup_id: str, delivery_id: str,
+                      pending: Sequence[Tuple[str, str, str]] = ()) -> float:
         """
         Parameters
         ----------
         seller_id : "C0", "C1", …
         pickup_id : str – the pickup node ID announced in the auction
         delivery_id : str - the delivery node ID announced in the auction
+        pending : (seller_id, pickup, delivery) of the orders we already bid on
 
         Notes
         -----
-        • Delivery node is looked up in seller's order CSV.
-        • We create a tmp CSV **with** that extra row, re-solve, then compute
-          revenue & cost like in rj() / cj().
+        • The order must exist in seller's order book (or CSV).
+        • The pair is inserted at its cheapest pickup/delivery positions in
+          our current route, then revenue & cost are computed like in
+          rj() / cj(). Close calls (|Δ| ≤ refine_margin) are re-solved.
+        • An order that fits nowhere within our solver config's limits is
+          priced like an unknown one.
+        • With pending orders the pair is priced against the route holding
+          them as well, so winning all of them stays within the limits.
         """
         # 1. locate seller’s order row -----------------------------
-        seller_csv = os.path.join(PATH_CARRIERS_INFO, f"order{seller_id}.csv")
-        with open(seller_csv) as f:
-            rows = list(csv.reader(f))[1:]
-
-        candidate_row = next((r for r in rows if r[1] == pickup_id and r[2] == delivery_id), None)
+        candidate_row = self._sellerOrder(seller_id, pickup_id, delivery_id)
         if candidate_row is None:
             # unknown order → certainly not profitable
             #print("returning -1e9")#debug
             return -1e9
 
-        # 2. build augmented order list ----------------------------
-        with open(self.path_order) as f:
-            my_rows = list(csv.reader(f))[1:]
+        # 2. cheapest insertion into the current route -------------
+        pending_rows = [self._sellerOrder(*order) or ("", *order[1:]) for order in pending]
+        fits = self._fits(pending_rows + [candidate_row])
+        routes, pending_dist = self.solution["route_map_ID"], 0.0
+        for row in pending_rows:
+            added, routes = insertOrder(routes, row[1], row[2], self.node_table.distance,
+                                        self.depot_id, fits)
+            if added is None:
+                return -1e9
+            pending_dist += added
+        extra_dist = cheapestInsertion(routes, pickup_id, delivery_id,
+                                       self.node_table.distance, self.depot_id, fits)[0]
+        if extra_dist is None:
+            # we could not serve it within our limits
+            return -1e9
+        delta = self._deltaProfitIfAdded(extra_dist)
+
+        # 3. close call → full solve with the augmented orders -----
+        if abs(delta) <= self.refine_margin:
+            metrics.count("cost_model.refine_solves")
+            augmented = solve_PnD(self.orders + pending_rows + [candidate_row], self.node_table,
+                                  self.depot_id, config=self.solver_config)
+            if augmented is not None:
+                extra_dist = min(extra_dist, sum(augmented["distance"]) - self.distance_information[0]
+                                 - pending_dist)
+                delta = self._deltaProfitIfAdded(extra_dist)
+
+        return delta
+
+    # the original name, kept for existing callers
+    profit_if_added = profitIfAdded
+
+    def _sellerOrder(self, seller_id: str, pickup_id: str, delivery_id: str):
+        """The seller's order row with this pickup and delivery, None if it has none."""
+        if self.order_books is not None and seller_id in self.order_books:
+            return self.order_books[seller_id].find(pickup_id, delivery_id)
+        seller_csv = os.path.join(self.carriers_dir, f"order{seller_id}.csv")
+        with open(seller_csv) as f:
+            rows = list(csv.reader(f))[1:]
+        return next((r for r in rows if r[1] == pickup_id and r[2] == delivery_id), None)
 
-        augmented_rows = my_rows + [candidate_row]
-        tmp_add_path = os.path.join(PATH_CARRIERS_INFO, "tmp_add.csv")
-        with open(tmp_add_path, "w", newline="") as tf:
-            w = csv.writer(tf)
-            w.writerow(["Order ID(pk)", "pickup", "delivery"])
-            w.writerows(augmented_rows)
+    # ──────────────────────────────────────────────────────────────────
+    # marginal profit of *bundles* of external orders
+    # ──────────────────────────────────────────────────────────────────
+    @metrics.timed("cost_model.bundle_values")
+    def bundleValues(self, candidates: Sequence[Tuple[str, str]], max_size: int = 3,
+                     candidate_limit: int = 8, max_bundles: int = 10) -> List[Tuple[Tuple[int, ...], float]]:
+        """
+        Δprofit of bundles of candidate (pickup, delivery) pairs, best first,
+        as (indices into candidates, Δprofit).
 
-        # 3. recompute distance / revenue / cost -------------------
-        dist_aug = sum(solve_PnD_problem(tmp_add_path,
-                                         self.path_travel_matrix)["distance"])
+        Only the candidate_limit best single orders are combined, bundles
+        hold at most max_size orders and grow only from kept bundles. A
+        bundle is dropped unless it is worth more than every bundle it
+        contains – a bidder never wins more than one of its bundles, so such
+        a bid could never help it. Every insertion has to keep the route
+        within solver_config's limits, so a won bundle can always be served.
+        """
+        routes = self.solution["route_map_ID"]
+        distance = self.node_table.distance
+        fits = self._fits([("", pickup_id, delivery_id) for pickup_id, delivery_id in candidates])
+
+        singles = []
+        for i, (pickup_id, delivery_id) in enumerate(candidates):
+            extra = cheapestInsertion(routes, pickup_id, delivery_id, distance, self.depot_id, fits)[0]
+            if extra is not None:
+                singles.append((self._deltaProfitIfAdded(extra), extra, i))
+        singles.sort(reverse=True)
+        pool = sorted(singles[:candidate_limit], key=lambda single: single[1])   # cheapest first
+
+        value = {}
+        for size in range(1, max_size + 1):
+            for combo in itertools.combinations(pool, size):
+                bundle = tuple(sorted(single[2] for single in combo))
+                if size == 1:
+                    value[bundle] = combo[0][0]
+                    continue
+                subsets = [tuple(i for i in bundle if i != left_out) for left_out in bundle]
+                if any(subset not in value for subset in subsets):
+                    continue
+                extra, new_routes = 0, routes
+                for _, _, i in combo:
+                    added, new_routes = insertOrder(new_routes, *candidates[i], distance, self.depot_id, fits)
+                    if added is None:
+                        break
+                    extra += added
+                else:
+                    delta = self._deltaProfitIfAdded(extra)
+                    if delta > max(value[subset] for subset in subsets):
+                        value[bundle] = delta
+
+        best = sorted(value.items(), key=lambda item: item[1], reverse=True)
+        return [(bundle, delta) for bundle, delta in best if delta > 0][:max_bundles]
+
+    def _fits(self, added_rows: Sequence = ()):
+        """fits(r, route) for models.routeDelta: solver_config's limits, our orders plus added_rows."""
+        config = self.solver_config or DEFAULT_CONFIG
+        distance = self.node_table.distance
+        loaded = None
+        if config.vehicle_capacities is not None:
+            loaded = [(row[1], row[2], config.orderLoad(row)) for row in list(self.orders) + list(added_rows)]
+
+        def fits(r: int, route: List[str]) -> bool:
+            loads = stopLoads(route, loaded) if loaded is not None else ()
+            return config.routeFits(route, loads, distance, r)
+        return fits
+
+    def _deltaProfitIfAdded(self, extra_dist: float) -> float:
+        dist_aug    = self.distance_information[0] + extra_dist
         revenue_aug = self.a1 + self.a2 * dist_aug
-        extra_dist  = dist_aug - self.distance_information[0]
         cost_aug    = self.b1 + self.b2 * extra_dist
-        profit_aug = revenue_aug - cost_aug
+        profit_aug  = revenue_aug - cost_aug
 
-        # 4. Δprofit relative to current baseline ------------------
-        delta = profit_aug - self.profit_information[0]
-        return delta
+        # Δprofit relative to current baseline
+        return profit_aug - self.profit_information[0]
 
     # ──────────────────────────────────────────────────────────────────
     # convenience – refresh every cached vector after external edit
     # ──────────────────────────────────────────────────────────────────
+    @metrics.timed("cost_model.invalidate")
     def invalidate(self) -> None:
+        self.solution             = self.solveCurrent()
         self.revenue              = self.rj()
         self.distance_information = self.distanceWithoutEachOrder()
         self.cost_information     = self.cj()
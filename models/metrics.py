@@ -0,0 +1,141 @@
+"""
+Per-phase timers and counters for the solver, the cost model, the agents
+and the services.
+
+    with metrics.timer("solve.search"):
+        ...
+    @metrics.timed("cost_model.invalidate")
+    def invalidate(self): ...
+    metrics.count("agent.bids")
+
+Off by default: timer() then hands back one shared no-op context manager
+and count() returns at once, so the instrumented code pays a function
+call and a flag test. Turn it on with enable() or CCN_METRICS=1 in the
+environment. Numbers are per process (solves in models.parallel worker
+processes are not seen; use the thread or serial executor to include
+them) and can be written as JSON (writeJSON) or served in the Prometheus
+text format (toPrometheus).
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+_enabled = os.environ.get("CCN_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_timers: Dict[str, list] = {}       # name -> [count, total seconds, max seconds]
+_counters: Dict[str, float] = {}
+_NULL = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# ── switches ────────────────────────────────────────────────────────────
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+# ── recording ───────────────────────────────────────────────────────────
+def timer(name: str):
+    """Context manager adding the block's wall time to name."""
+    return _Timer(name) if _enabled else _NULL
+
+
+def timed(name: str):
+    """Decorator: every call of the function is timed under name."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def observe(name: str, seconds: float) -> None:
+    """Add one timing measured elsewhere."""
+    if not _enabled:
+        return
+    with _lock:
+        entry = _timers.get(name)
+        if entry is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+
+def count(name: str, n: float = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+# ── export ──────────────────────────────────────────────────────────────
+def snapshot() -> Dict:
+    """{"timers": {name: {count, total, mean, max}}, "counters": {name: value}}"""
+    with _lock:
+        return {"timers": {name: {"count": c, "total": total, "mean": total / c, "max": longest}
+                           for name, (c, total, longest) in sorted(_timers.items())},
+                "counters": dict(sorted(_counters.items()))}
+
+
+def writeJSON(path: str, extra: Optional[Dict] = None) -> None:
+    with open(path, "w") as f:
+        json.dump({**(extra or {}), **snapshot()}, f, indent=2)
+
+
+def toPrometheus(prefix: str = "ccn") -> str:
+    data = snapshot()
+    lines = [f"# TYPE {prefix}_phase_seconds summary"]
+    for name, t in data["timers"].items():
+        lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {t["count"]}')
+        lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {t["total"]:.6f}')
+    lines.append(f"# TYPE {prefix}_phase_seconds_max gauge")
+    for name, t in data["timers"].items():
+        lines.append(f'{prefix}_phase_seconds_max{{phase="{name}"}} {t["max"]:.6f}')
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in data["counters"].items():
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
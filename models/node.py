@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 class Node:
     def __init__(self, _id:str, _name:str, _x:int = 0, _y:int = 0):
@@ -13,4 +14,13 @@ class Node:
             distance = int(distance) + 1
         else:
             distance = int(distance)
-        return distance
\ No newline at end of file
+        return distance
+
+def measureDistanceMatrix(from_xs, from_ys, to_xs = None, to_ys = None) -> np.ndarray:
+    """Vectorized Node.measureDistanceFrom for every (from, to) pair, same rounding rule."""
+    if to_xs is None:
+        to_xs, to_ys = from_xs, from_ys
+    dx = np.asarray(from_xs, dtype=np.int64)[:, None] - np.asarray(to_xs, dtype=np.int64)[None, :]
+    dy = np.asarray(from_ys, dtype=np.int64)[:, None] - np.asarray(to_ys, dtype=np.int64)[None, :]
+    distance = np.sqrt((dx * dx + dy * dy).astype(np.float64))
+    return distance.astype(np.int32) + (distance % 10 > 5)
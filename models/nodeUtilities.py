@@ -1,6 +1,7 @@
-import csv, os, pandas as pd
+import csv, hashlib, os, threading, numpy as np, pandas as pd
+from collections.abc import Mapping
 
-from models import node
+from models import metrics, node
 
 # define path
 PATH_MODELS = os.path.dirname(os.path.abspath(__file__))
@@ -16,9 +17,8 @@ def addWarehouseInfoToCSV(warehouse_x:int, warehouse_y:int):
     df.loc[len(df)] = ['N99', 'WAREHOUSE', warehouse_x, warehouse_y]
     df.to_csv(PATH_UPDATED_CSV, index=False)
 
-def readNodeInformation(file_name = "nodeInfo.csv") -> list[node.Node]:
-
-    PATH_FILE = os.path.join(PATH_INPUT, file_name)
+@metrics.timed("csv.parse_nodes")
+def _parseNodeCSV(PATH_FILE:str) -> list[node.Node]:
 
     with open(PATH_FILE) as csv_file:
         node_info = list(csv.reader(csv_file))
@@ -32,33 +32,143 @@ def readNodeInformation(file_name = "nodeInfo.csv") -> list[node.Node]:
     
     return nodes
 
+class NodeRegistry(Mapping):
+    """Node table loaded once: dict by ID, contiguous index and NumPy coordinates."""
+
+    def __init__(self, nodes:list[node.Node], path:str = None, version = None):
+        self.path = path
+        self.version = version
+        self.nodes = list(nodes)
+        self.ids = [every_node.id for every_node in self.nodes]
+        self.index = {ID: i for i, ID in enumerate(self.ids)}
+        self.xs = np.array([every_node.x for every_node in self.nodes], dtype=np.int64)
+        self.ys = np.array([every_node.y for every_node in self.nodes], dtype=np.int64)
+        self._distance_matrix = None
+        # content hash, stable across processes and file rewrites
+        self.digest = hashlib.sha1(
+            "\n".join(self.ids).encode() + self.xs.tobytes() + self.ys.tobytes()
+            ).hexdigest()
+
+    def __getstate__(self):
+        # worker processes re-open the .npy cache instead of receiving a copy
+        state = self.__dict__.copy()
+        state["_distance_matrix"] = None
+        return state
+
+    def __getitem__(self, ID:str) -> node.Node:
+        return self.nodes[self.index[ID]]
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def indicesOf(self, IDs) -> np.ndarray:
+        return np.fromiter((self.index[ID] for ID in IDs), dtype=np.intp)
+
+    def distanceMatrix(self) -> np.ndarray:
+        """All-pairs distances for the whole table, memory-mapped from the .npy cache."""
+        if self._distance_matrix is None:
+            self._distance_matrix = loadDistanceMatrix(self.xs, self.ys)
+        return self._distance_matrix
+
+    def subMatrix(self, IDs) -> np.ndarray:
+        """Distances between the given nodes, in the given order."""
+        index = self.indicesOf(IDs)
+        return np.asarray(self.distanceMatrix()[np.ix_(index, index)])
+
+    def distance(self, from_ID:str, to_ID:str) -> int:
+        return int(self.distanceMatrix()[self.index[from_ID], self.index[to_ID]])
+
+# process-wide registries, keyed by absolute CSV path
+_REGISTRIES:dict[str, NodeRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+def getNodeRegistry(file_name = "nodeInfoFromGUI.csv") -> NodeRegistry:
+    """Return the registry for a node CSV, reloading it only when the file changed."""
+
+    PATH_FILE = os.path.join(PATH_INPUT, file_name)
+    stat = os.stat(PATH_FILE)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(PATH_FILE)
+        if registry is None or registry.version != version:
+            registry = NodeRegistry(_parseNodeCSV(PATH_FILE), PATH_FILE, version)
+            _REGISTRIES[PATH_FILE] = registry
+        return registry
+
+# rows per block when filling a large matrix, bounds the float64 temporaries
+_MATRIX_BLOCK_ROWS = 1024
+# distanceMatrix_<digest>.npy files kept in PATH_METADATA, least recently used go first
+MAX_MATRIX_FILES = 8
+
+def loadDistanceMatrix(xs:np.ndarray, ys:np.ndarray) -> np.ndarray:
+    """Load the all-pairs matrix for these coordinates from PATH_METADATA, computing it once."""
+
+    digest = hashlib.sha1(np.ascontiguousarray(xs).tobytes() + np.ascontiguousarray(ys).tobytes()).hexdigest()
+    PATH_CACHE = os.path.join(PATH_METADATA, f"distanceMatrix_{digest[:16]}.npy")
+
+    try:
+        matrix = np.load(PATH_CACHE, mmap_mode="r")
+        os.utime(PATH_CACHE)        # mark as recently used
+    except FileNotFoundError:       # never computed, or evicted by another process
+        _writeDistanceMatrix(PATH_CACHE, xs, ys)
+        _evictDistanceMatrices(keep=PATH_CACHE)
+        matrix = np.load(PATH_CACHE, mmap_mode="r")
+    return matrix
+
+def _evictDistanceMatrices(keep:str) -> None:
+    """Delete all but the MAX_MATRIX_FILES most recently used matrix files."""
+    cached = []
+    for name in os.listdir(PATH_METADATA):
+        if name.startswith("distanceMatrix_") and name.endswith(".npy"):
+            path = os.path.join(PATH_METADATA, name)
+            try:
+                cached.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:
+                continue
+    cached.sort(reverse=True)
+    for _, path in cached[MAX_MATRIX_FILES:]:
+        if path != keep:
+            try:
+                os.remove(path)     # open memory maps stay valid
+            except FileNotFoundError:
+                pass
+
+@metrics.timed("matrix.compute")
+def _writeDistanceMatrix(PATH_CACHE:str, xs:np.ndarray, ys:np.ndarray) -> None:
+    os.makedirs(PATH_METADATA, exist_ok=True)
+    PATH_TMP = f"{PATH_CACHE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    matrix = np.lib.format.open_memmap(PATH_TMP, mode="w+", dtype=np.int32, shape=(len(xs), len(xs)))
+    for start in range(0, len(xs), _MATRIX_BLOCK_ROWS):
+        stop = start + _MATRIX_BLOCK_ROWS
+        matrix[start:stop] = node.measureDistanceMatrix(xs[start:stop], ys[start:stop], xs, ys)
+    matrix.flush()
+    del matrix
+    os.replace(PATH_TMP, PATH_CACHE)
+
+def readNodeInformation(file_name = "nodeInfo.csv") -> list[node.Node]:
+    return list(getNodeRegistry(file_name).nodes)
+
+@metrics.timed("matrix.write_csv")
 def writeTravelMatrix(nodes:list[node.Node], file_name = "travelMatrix.csv"):
 
     PATH_MATRIX = os.path.join(PATH_METADATA, file_name)
-    def getAllNodeID() -> list[str]:
-
-        node_ID:list[str] = []
-        
-        for every_node in nodes:
-            node_ID.append(every_node.id)
+    node_ID = [every_node.id for every_node in nodes]
 
-        return node_ID
-    
     # create a folder if not exist
     os.makedirs(os.path.dirname(PATH_MATRIX), exist_ok=True)
 
-    node_ID = getAllNodeID()
+    distance = node.measureDistanceMatrix(
+        [every_node.x for every_node in nodes], [every_node.y for every_node in nodes]
+        )
 
     with open(PATH_MATRIX, 'w', newline='') as csvFile:
         spamwriter = csv.writer(csvFile, quoting=csv.QUOTE_MINIMAL)
         spamwriter.writerow(["Distance"] + node_ID)
-
-        for every_node in nodes:
-            distance:list[float] = []
-            for _ in nodes:
-                distance.append(every_node.measureDistanceFrom(_))
-
-            spamwriter.writerow([every_node.id] + distance)
+        spamwriter.writerows([ID] + row for ID, row in zip(node_ID, distance.tolist()))
 
 def produceDemandList(selected_nodes:list[dict]) -> list[int]:
 
@@ -80,17 +190,11 @@ def convertDictionaryIntoNodes(selected_nodes:list[dict]) -> list[node.Node]:
     pass
 
 def getNodeIDWithIndex(index:int = 0) -> str:
-    nodes = readNodeInformation("nodeInfoFromGUI.csv")
-    return(nodes[index].id)
+    return getNodeRegistry("nodeInfoFromGUI.csv").ids[index]
 
 
 def getNodeWithNodeID(ID:str) -> node.Node:
-    nodes = readNodeInformation("nodeInfoFromGUI.csv")
-    for i in nodes:
-        if i.id == ID:
-            return i
+    return getNodeRegistry("nodeInfoFromGUI.csv").get(ID)
         
 def getNumberOfNodes(file_name = 'nodeInfo.csv'):
-    PATH_UPDATED_CSV = os.path.join(PATH_INPUT, file_name)
-    with open(PATH_UPDATED_CSV) as csv_file:
-        return len(list(csv.reader(csv_file)))-1
\ No newline at end of file
+    return len(getNodeRegistry(file_name))
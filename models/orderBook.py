@@ -0,0 +1,102 @@
+"""
+In-memory order book of one carrier.
+
+Orders are compact tuples (order_pk, pickup, delivery[, load]) that index
+like the CSV rows they replace. The book keeps them in a dict keyed by
+order_pk – O(1) add / remove, insertion order kept – and is the source of
+truth during a run; save() writes it back to its CSV when asked to.
+version counts the changes, so readers can tell whether the book moved
+since they last looked (dirty only tracks unsaved changes).
+"""
+
+import csv
+import os
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+
+class Order(NamedTuple):
+    order_pk: str
+    pickup: str
+    delivery: str
+    load: int = 1
+
+    @classmethod
+    def fromRow(cls, row) -> "Order":
+        load = int(row[3]) if len(row) > 3 and row[3] != "" else 1
+        return cls(row[0], row[1], row[2], load)
+
+
+class OrderBook:
+    HEADER = ["Order ID(pk)", "pickup", "delivery"]
+
+    def __init__(self, orders=(), path: Optional[str] = None):
+        self.path = path
+        self._orders: Dict[str, Order] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+        self.version = 0
+        for order in orders:
+            self.add(order)
+        self.dirty = False
+        self.version = 0
+
+    @classmethod
+    def load(cls, path: str) -> "OrderBook":
+        with open(path) as f:
+            return cls((Order.fromRow(row) for row in list(csv.reader(f))[1:] if row), path)
+
+    # ── access ──────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[Order]:
+        return iter(self.rows())
+
+    def __contains__(self, order_pk: str) -> bool:
+        return order_pk in self._orders
+
+    def get(self, order_pk: str) -> Optional[Order]:
+        return self._orders.get(order_pk)
+
+    def rows(self) -> List[Order]:
+        with self._lock:
+            return list(self._orders.values())
+
+    def find(self, pickup_id: str, delivery_id: str) -> Optional[Order]:
+        """First order with this pickup and delivery."""
+        with self._lock:
+            return next((order for order in self._orders.values()
+                         if order.pickup == pickup_id and order.delivery == delivery_id), None)
+
+    # ── updates ─────────────────────────────────────────────────────────
+    def add(self, order) -> Order:
+        order = order if isinstance(order, Order) else Order.fromRow(order)
+        with self._lock:
+            self._orders[order.order_pk] = order
+            self.dirty = True
+            self.version += 1
+        return order
+
+    def remove(self, order_pk: str) -> Optional[Order]:
+        with self._lock:
+            order = self._orders.pop(order_pk, None)
+            if order is not None:
+                self.dirty = True
+                self.version += 1
+        return order
+
+    # ── persistence ─────────────────────────────────────────────────────
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the book as an order CSV (atomically); load goes in a 4th column if used."""
+        path = path or self.path
+        rows = self.rows()
+        with_load = any(order.load != 1 for order in rows)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(self.HEADER + (["load"] if with_load else []))
+            w.writerows(order if with_load else order[:3] for order in rows)
+        os.replace(tmp_path, path)
+        if path == self.path:
+            self.dirty = False
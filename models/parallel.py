@@ -0,0 +1,82 @@
+"""
+Fan independent PnD solves out over a pluggable executor.
+
+    EXECUTOR_KIND  "process" (default – OR-Tools callbacks hold the GIL),
+                   "thread" or "serial"
+    MAX_WORKERS    pool size, None = os.cpu_count()
+
+Results always come back in job order. Cached solves are answered in the
+calling process and only the misses are shipped to the pool.
+"""
+
+import atexit
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from models import solveCache
+from models.pickupDelivery import solve_cache_key, solve_PnD
+
+EXECUTOR_KIND = "process"
+MAX_WORKERS: Optional[int] = None
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def configureExecutor(kind: str = "process", max_workers: Optional[int] = None) -> None:
+    """Select the executor used by solveMany; the old pool is shut down."""
+    global EXECUTOR_KIND, MAX_WORKERS
+    if kind not in ("process", "thread", "serial"):
+        raise ValueError(f"unknown executor kind: {kind}")
+    shutdownExecutor()
+    EXECUTOR_KIND, MAX_WORKERS = kind, max_workers
+
+
+def getExecutor() -> Optional[Executor]:
+    """Lazily created, process-wide pool; None when running serially."""
+    global _executor
+    if EXECUTOR_KIND == "serial" or MAX_WORKERS == 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            pool = ProcessPoolExecutor if EXECUTOR_KIND == "process" else ThreadPoolExecutor
+            _executor = pool(max_workers=MAX_WORKERS)
+        return _executor
+
+
+@atexit.register
+def shutdownExecutor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def _solveJob(job: dict) -> Optional[dict]:
+    return solve_PnD(**job, use_cache=False)
+
+
+def solveMany(jobs: List[dict]) -> List[Optional[dict]]:
+    """
+    Solve every job, a dict of solve_PnD keyword arguments
+    (orders, node_table, depot_id, initial_routes, time_limit, config).
+    """
+    cache = solveCache.SOLVE_CACHE
+    keys = [solve_cache_key(job["orders"], job["node_table"], job.get("depot_id", "W0"), job.get("time_limit"),
+                            job.get("config"))
+            for job in jobs]
+    results = [cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    executor = getExecutor() if len(pending) > 1 else None
+    if executor is None:
+        solved = [_solveJob(jobs[i]) for i in pending]
+    else:
+        solved = list(executor.map(_solveJob, [jobs[i] for i in pending]))
+
+    for i, result in zip(pending, solved):
+        cache.put(keys[i], result)
+        results[i] = result
+    return results
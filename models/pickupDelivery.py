@@ -1,82 +1,98 @@
 """Simple Pickup Delivery Problem (PDP)."""
 
-from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
-import pandas
-import models.nodeUtilities as nu
+import csv
 import os
+import models.nodeUtilities as nu
+from models import metrics, solveCache
+from models.node import measureDistanceMatrix
+from models.routeDelta import insertOrder
+from models.solverConfig import DEFAULT_CONFIG, SolverConfig
 
 PATH_MODELS = os.path.dirname(os.path.abspath(__file__))
 PATH_METADATA = os.path.join(PATH_MODELS, 'metadata')
 PATH_INPUT = os.path.join(PATH_MODELS, 'input')
 
-def create_data_model(FILE_ORDER:str, FILE_TRAVELMATRIX:str, DEPOT_ID:str = "W0"):
-    """Stores the data for the problem."""
-    def getPickupDeliveryNodeIDPairs() -> list[str]:
-        import csv
-        PATH_FILE = os.path.join(PATH_INPUT, FILE_ORDER)
-        with open(PATH_FILE) as f:
-            orderInfo = list(csv.reader(f))
-
-        pickup_delivery_nodeID_paris:list[str] = []
-        for row in orderInfo[1:]:
-            pickup_delivery_nodeID_paris.append([row[1], row[2]])
-        
-        return(pickup_delivery_nodeID_paris)
-    
-    def getPickupDeliveryNodes() -> list:        
-        pickup_delivery_nodeID_paris = getPickupDeliveryNodeIDPairs()
-        pickup_delivery_nodes:list[int] = []
-
-        for pair in pickup_delivery_nodeID_paris:
-            pickup_delivery_nodes.append(nu.getNodeWithNodeID(pair[0]))
-            pickup_delivery_nodes.append(nu.getNodeWithNodeID(pair[1]))
-        pickup_delivery_nodes.append(nu.getNodeWithNodeID(DEPOT_ID))
-        
-        return(pickup_delivery_nodes)
-        
-    def getNodesIndexWithDemand() -> list[int]:
-        nodes_with_demand:list[int] = []
-        for order in data["pickup_delivery_index_pairs"]:
-            for node in order:
-                nodes_with_demand.append(node)
-
-        return(nodes_with_demand)
-    
-    def readTravelMatrix(file_name):
-        PATH_FILE = os.path.join(PATH_METADATA, file_name)
-
-        df = pandas.read_csv(PATH_FILE, index_col=0)
-        matrix = df.values.tolist()
-        matrix = [[int(value) for value in row] for row in matrix]
-
-        return matrix
-
-    def convertNodeIDToNodeIndex(pair_of_nodeID:list[list[str]]) -> list[int]:
-        pair_of_nodeIndex:list[list[int]] = []
-        list_of_nodeID:list[str] = []
-        for pair in pair_of_nodeID:
-            list_of_nodeID.append(pair[0])
-            list_of_nodeID.append(pair[1])
-        list_of_sorted_nodeID = sorted(list_of_nodeID)
-
-        for i in range(len(list_of_nodeID)//2):
-            pair_of_nodeIndex.append([list_of_sorted_nodeID.index(list_of_nodeID[2*i]), list_of_sorted_nodeID.index(list_of_nodeID[2*i+1])])
-
-        return pair_of_nodeIndex
-
-    nu.writeTravelMatrix(getPickupDeliveryNodes(), FILE_TRAVELMATRIX)
+class InfeasibleRouteError(RuntimeError):
+    """No route serves the orders within the solver config's limits."""
+
+@metrics.timed("csv.read_orders")
+def read_orders(FILE_ORDER:str) -> list[list[str]]:
+    """Reads the order rows [Order ID(pk), pickup, delivery] from an order CSV."""
+    PATH_FILE = os.path.join(PATH_INPUT, FILE_ORDER)
+    with open(PATH_FILE) as f:
+        return list(csv.reader(f))[1:]
+
+def build_data_model(orders, node_table, depot_id:str = "W0", config:SolverConfig = DEFAULT_CONFIG):
+    """Stores the data for the problem, built from in-memory orders.
+
+    orders      rows/tuples of (order_pk, pickup_id, delivery_id[, load]);
+                an order whose pickup is its delivery is a plain visit,
+                one stop with no pickup/delivery pair and no load
+    node_table  mapping node ID -> models.node.Node; a NodeRegistry
+                also supplies the distances from its cached global matrix
+    config      fleet, capacities and time windows (models.solverConfig)
+    """
+    pickup_delivery_ID_pairs = [[order[1], order[2]] for order in orders]
+
+    # solver index layout: pickup/delivery stops sorted by node ID, depot last
+    stop_IDs:list[str] = [ID for pair in pickup_delivery_ID_pairs for ID in pair[:1 if pair[0] == pair[1] else 2]]
+    sorted_slots = sorted(range(len(stop_IDs)), key=stop_IDs.__getitem__)
+    slot_of_stop = [0] * len(stop_IDs)
+    for slot, stop in enumerate(sorted_slots):
+        slot_of_stop[stop] = slot
+
+    node_IDs = [stop_IDs[stop] for stop in sorted_slots] + [depot_id]
+    nodes = [node_table[ID] for ID in node_IDs]
 
     data = {}
-    data["pickup_delivery_ID_pairs"] = getPickupDeliveryNodeIDPairs()
-    data["pickup_delivery_index_pairs"] = convertNodeIDToNodeIndex(data["pickup_delivery_ID_pairs"])
-    data["nodes_with_demand"] = getNodesIndexWithDemand()    
-    data["distance_matrix"] = readTravelMatrix(FILE_TRAVELMATRIX)
-    data["num_vehicles"] = 1
+    data["pickup_delivery_ID_pairs"] = pickup_delivery_ID_pairs
+    data["pickup_delivery_index_pairs"] = []
+    data["visit_indices"] = []
+    paired_orders = []
+    stop = 0
+    for order, (pickup_id, delivery_id) in zip(orders, pickup_delivery_ID_pairs):
+        if pickup_id == delivery_id:
+            data["visit_indices"].append(slot_of_stop[stop])
+            stop += 1
+        else:
+            data["pickup_delivery_index_pairs"].append([slot_of_stop[stop], slot_of_stop[stop + 1]])
+            paired_orders.append(order)
+            stop += 2
+    data["nodes_with_demand"] = [slot_of_stop[stop] for stop in range(len(stop_IDs))]
+    data["node_IDs"] = node_IDs
+    if isinstance(node_table, nu.NodeRegistry):
+        data["distance_matrix"] = node_table.subMatrix(node_IDs).tolist()
+    else:
+        data["distance_matrix"] = measureDistanceMatrix(
+            [every_node.x for every_node in nodes], [every_node.y for every_node in nodes]
+        ).tolist()
+    data["num_vehicles"] = config.num_vehicles
     data["depot"] = len(data["nodes_with_demand"])
+    data["warehouse_location"] = [nodes[-1].x, nodes[-1].y]
+
+    if config.vehicle_capacities is not None:
+        data["vehicle_capacities"] = config.vehicle_capacities
+        data["demands"] = [0] * len(node_IDs)
+        for order, (pickup, delivery) in zip(paired_orders, data["pickup_delivery_index_pairs"]):
+            load = config.orderLoad(order)
+            data["demands"][pickup] = load
+            data["demands"][delivery] = -load
+    if config.timed:
+        data["time_matrix"] = config.travelTimes(data["distance_matrix"], data["depot"])
+        data["horizon"] = config.timeHorizon(data["time_matrix"])
+        data["time_windows"] = [config.time_windows.get(ID, (0, data["horizon"])) for ID in node_IDs]
 
     return data
 
+def create_data_model(FILE_ORDER:str, FILE_TRAVELMATRIX:str = None, DEPOT_ID:str = "W0"):
+    """Stores the data for the problem, read from the order CSV.
+
+    FILE_TRAVELMATRIX is kept for call-site compatibility; the matrix is
+    built in memory and no longer round-tripped through a CSV.
+    """
+    return build_data_model(read_orders(FILE_ORDER), nu.getNodeRegistry("nodeInfoFromGUI.csv"), DEPOT_ID)
+
 def print_solution(data, manager, routing, solution, depot_id:str):
     """Prints solution on console."""
 
@@ -86,8 +102,7 @@ def print_solution(data, manager, routing, solution, depot_id:str):
     resolved_solution["route_map_index"] = []
     resolved_solution["route_map_ID"] = []
 
-    warehouse = nu.getNodeWithNodeID(depot_id)
-    resolved_solution["warehouse_location"] = [warehouse.x, warehouse.y]
+    resolved_solution["warehouse_location"] = list(data["warehouse_location"])
 
     #print(f"Objective: {solution.ObjectiveValue()}")
     total_distance = 0
@@ -130,30 +145,121 @@ def print_solution(data, manager, routing, solution, depot_id:str):
         resolved_solution["distance"].append(route_distance)
         resolved_solution["route_map_index"][-1] = route_map_index
 
-        def convertNodeIndexToNodeID(index:int) -> str:
-            list_of_nodeID:list[str] = []
-            if index == len(data["nodes_with_demand"]):
-                return depot_id
-            for pair in data["pickup_delivery_ID_pairs"]:
-                list_of_nodeID.append(pair[0])
-                list_of_nodeID.append(pair[1])
-            list_of_sorted_nodeID = sorted(list_of_nodeID)
-
-            return list_of_sorted_nodeID[index]
-    
         for node_index in route_map_index:
-            route_map_ID.append(convertNodeIndexToNodeID(node_index))
-            # print(node_index, "->", convertNodeIndexToNodeID(node_index))     
+            route_map_ID.append(data["node_IDs"][node_index])
         resolved_solution["route_map_ID"][-1] = route_map_ID
         
     #print(f"Total Distance of all routes: {total_distance}m")
 
     return resolved_solution
 
-def solve_PnD_problem(file_order, file_travelMatrix, depot_id:str = "W0"):
-    """Entry point of the program."""
+def seed_routes(data, initial_routes) -> list[list[int]]:
+    """Map a previous route_map_ID onto this problem's node indices.
+
+    Stops that are no longer ordered are dropped, orders that lost a stop or
+    got out of sequence are taken out, and orders missing from the previous
+    route are added back by cheapest insertion.
+    """
+    depot = data["depot"]
+    free_slots:dict[str, list[int]] = {}
+    for slot, ID in enumerate(data["node_IDs"][:depot]):
+        free_slots.setdefault(ID, []).append(slot)
+
+    routes:list[list[int]] = []
+    for route in list(initial_routes)[:data["num_vehicles"]]:
+        routes.append([free_slots[ID].pop(0) for ID in route if free_slots.get(ID)])
+    routes += [[] for _ in range(data["num_vehicles"] - len(routes))]
+
+    position = {slot: (r, i) for r, route in enumerate(routes) for i, slot in enumerate(route)}
+    missing = []
+    for pickup, delivery in data["pickup_delivery_index_pairs"]:
+        p, d = position.get(pickup), position.get(delivery)
+        if p is None or d is None or p[0] != d[0] or p[1] > d[1]:
+            missing.append((pickup, delivery))
+    dropped = {slot for pair in missing for slot in pair}
+    routes = [[depot] + [slot for slot in route if slot not in dropped] + [depot] for route in routes]
+
+    def distance(from_node, to_node):
+        return data["distance_matrix"][from_node][to_node]
+    for pickup, delivery in missing:
+        routes = insertOrder(routes, pickup, delivery, distance)[1]
+
+    return [[slot for slot in route if slot != depot] for route in routes]
+
+def node_table_version(node_table, orders, depot_id:str):
+    """Identify the distances a solve depends on, for the solve cache."""
+    if isinstance(node_table, nu.NodeRegistry):
+        return node_table.digest
+    IDs = sorted({ID for order in orders for ID in order[1:3]} | {depot_id})
+    return tuple((ID, node_table[ID].x, node_table[ID].y) for ID in IDs)
+
+def solve_cache_key(orders, node_table, depot_id:str = "W0", time_limit:float = None,
+                    config:SolverConfig = None) -> tuple:
+    params = (time_limit,) if config is None else (time_limit, config.key())
+    return solveCache.SOLVE_CACHE.key(orders, depot_id, params,
+                                      node_table_version(node_table, orders, depot_id))
+
+def solve_PnD_problem(file_order, file_travelMatrix = None, depot_id:str = "W0",
+                      initial_routes = None, time_limit:float = None, use_cache:bool = True,
+                      arc_evaluator:str = "matrix", config:SolverConfig = None):
+    """Entry point of the program, reading orders from a CSV."""
+    return solve_PnD(read_orders(file_order), nu.getNodeRegistry("nodeInfoFromGUI.csv"), depot_id,
+                     initial_routes, time_limit, use_cache, arc_evaluator, config)
+
+def solve_PnD(orders, node_table, depot_id:str = "W0", initial_routes = None, time_limit:float = None,
+              use_cache:bool = True, arc_evaluator:str = "matrix", config:SolverConfig = None):
+    """Solve the PnD problem for in-memory orders and a preloaded node table.
+
+    initial_routes  a previous "route_map_ID"; the search then starts from it
+    time_limit      seconds allowed for the search, config.time_limit if None
+                    (finite once the config has capacities or time windows)
+    use_cache       reuse the result of an identical earlier solve (solveCache)
+    arc_evaluator   "matrix" registers the distances natively with OR-Tools,
+                    "callback" evaluates every arc in a Python callback
+    config          fleet size, capacities, time windows and search
+                    heuristics; None is the single uncapacitated truck
+
+    Returns None when no route keeps to the config's limits (or none was
+    found within the time limit).
+    """
+    if use_cache:
+        cache = solveCache.SOLVE_CACHE
+        key = solve_cache_key(orders, node_table, depot_id, time_limit, config)
+        resolved_solution = cache.get(key)
+        metrics.count("solve.cache_miss" if resolved_solution is None else "solve.cache_hit")
+        if resolved_solution is None:
+            resolved_solution = _solve(orders, node_table, depot_id, initial_routes, time_limit,
+                                       arc_evaluator, config)
+            cache.put(key, resolved_solution)
+        return resolved_solution
+
+    return _solve(orders, node_table, depot_id, initial_routes, time_limit, arc_evaluator, config)
+
+def register_arc_costs(routing, manager, distance_matrix, arc_evaluator:str = "matrix") -> int:
+    """Register the distance matrix as a transit evaluator and return its index."""
+    if arc_evaluator == "matrix":
+        # evaluated inside OR-Tools, no Python call per arc
+        return routing.RegisterTransitMatrix(distance_matrix)
+
+    if arc_evaluator != "callback":
+        raise ValueError(f"unknown arc evaluator: {arc_evaluator}")
+
+    def distance_callback(from_index, to_index):
+        """Returns the distance between the two nodes."""
+        # Convert from routing variable Index to distance matrix NodeIndex.
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        return distance_matrix[from_node][to_node]
+
+    return routing.RegisterTransitCallback(distance_callback)
+
+def _solve(orders, node_table, depot_id:str, initial_routes, time_limit:float, arc_evaluator:str,
+           config:SolverConfig = None):
+    config = config or DEFAULT_CONFIG
+
     # Instantiate the data problem.
-    data = create_data_model(file_order, file_travelMatrix, depot_id)
+    with metrics.timer("solve.build_data"):
+        data = build_data_model(orders, node_table, depot_id, config)
 
     # Create the routing index manager.
     manager = pywrapcp.RoutingIndexManager(
@@ -167,14 +273,7 @@ def solve_PnD_problem(file_order, file_travelMatrix, depot_id:str = "W0"):
     routing.AddDisjunction([depot_idx], 10_000_000)   # huge penalty
 
     # Define cost of each arc.
-    def distance_callback(from_index, to_index):
-        """Returns the manhattan distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["distance_matrix"][from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    transit_callback_index = register_arc_costs(routing, manager, data["distance_matrix"], arc_evaluator)
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
     # Add Distance constraint.
@@ -182,12 +281,43 @@ def solve_PnD_problem(file_order, file_travelMatrix, depot_id:str = "W0"):
     routing.AddDimension(
         transit_callback_index,
         0,  # no slack
-        8000,  # vehicle maximum travel distance
+        config.max_route_distance,  # vehicle maximum travel distance
         True,  # start cumul to zero
         dimension_name,
     )
     distance_dimension = routing.GetDimensionOrDie(dimension_name)
-    distance_dimension.SetGlobalSpanCostCoefficient(100)
+    distance_dimension.SetGlobalSpanCostCoefficient(config.span_cost_coefficient)
+
+    # Add Capacity constraint.
+    if "demands" in data:
+        demand_callback_index = routing.RegisterUnaryTransitVector(data["demands"])
+        routing.AddDimensionWithVehicleCapacity(
+            demand_callback_index,
+            0,  # null capacity slack
+            data["vehicle_capacities"],  # vehicle maximum capacities
+            True,  # start cumul to zero
+            "Capacity",
+        )
+
+    # Add Time Window constraint.
+    if "time_matrix" in data:
+        time_callback_index = register_arc_costs(routing, manager, data["time_matrix"], arc_evaluator)
+        routing.AddDimension(
+            time_callback_index,
+            data["horizon"],  # allow waiting time
+            data["horizon"],  # latest end of a route; the windows bound each stop
+            False,  # a truck may leave the depot late
+            "Time",
+        )
+        time_dimension = routing.GetDimensionOrDie("Time")
+        for node, (open_time, close_time) in enumerate(data["time_windows"]):
+            if node != data["depot"]:
+                time_dimension.CumulVar(manager.NodeToIndex(node)).SetRange(open_time, close_time)
+        open_time, close_time = data["time_windows"][data["depot"]]
+        for vehicle_id in range(data["num_vehicles"]):
+            time_dimension.CumulVar(routing.Start(vehicle_id)).SetRange(open_time, close_time)
+            routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.Start(vehicle_id)))
+            routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.End(vehicle_id)))
 
     # Define Transportation Requests.
     for request in data["pickup_delivery_index_pairs"]:
@@ -195,6 +325,9 @@ def solve_PnD_problem(file_order, file_travelMatrix, depot_id:str = "W0"):
         delivery_index = manager.NodeToIndex(request[1])
 
         routing.AddPickupAndDelivery(pickup_index, delivery_index)
+        routing.solver().Add(
+            routing.VehicleVar(pickup_index) == routing.VehicleVar(delivery_index)
+        )
         routing.solver().Add(
             distance_dimension.CumulVar(pickup_index)
             <= distance_dimension.CumulVar(delivery_index) - 1
@@ -202,18 +335,22 @@ def solve_PnD_problem(file_order, file_travelMatrix, depot_id:str = "W0"):
 
     # Setting first solution heuristic.
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-    search_parameters.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
-    )
-
-    # Solve the problem.
-    solution = routing.SolveWithParameters(search_parameters)
+    config.applyTo(search_parameters, time_limit)
+
+    # Solve the problem, warm-started from the previous route if given.
+    solution = None
+    with metrics.timer("solve.search"):
+        if initial_routes:
+            routing.CloseModelWithParameters(search_parameters)
+            initial_solution = routing.ReadAssignmentFromRoutes(seed_routes(data, initial_routes), True)
+            if initial_solution:
+                metrics.count("solve.warm_start")
+                solution = routing.SolveFromAssignmentWithParameters(initial_solution, search_parameters)
+        if not solution:
+            solution = routing.SolveWithParameters(search_parameters)
 
     # print(solution)
 
-    # Print solution on console.
-    if solution:
-        return print_solution(data, manager, routing, solution, depot_id)
-    else:
-        print("NO SOLUTION")
+    if not solution:
         return None
+    return print_solution(data, manager, routing, solution, depot_id)
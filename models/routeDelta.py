@@ -0,0 +1,201 @@
+"""
+Incremental route edits on solved PnD routes (route_map_ID lists).
+distance(from_ID, to_ID) is any arc-cost lookup, e.g. NodeRegistry.distance.
+fits(r, route) says whether route r may become route (start to end depot)
+– e.g. SolverConfig.routeFits with the carrier's limits; None accepts all.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Distance = Callable[[str, str], int]
+Fits = Callable[[int, List[str]], bool]
+
+
+def _locateStops(routes: Sequence[Sequence[str]]) -> Dict[str, List[Tuple[int, int]]]:
+    """Node ID -> [(route, position), …] for every stop between start and end depot."""
+    stops: Dict[str, List[Tuple[int, int]]] = {}
+    for r, route in enumerate(routes):
+        for pos in range(1, len(route) - 1):
+            stops.setdefault(route[pos], []).append((r, pos))
+    return stops
+
+
+def _takeStop(stops: Dict[str, List[Tuple[int, int]]], node_id: str, after=None):
+    """Claim one occurrence of node_id, preferring the first one after `after`."""
+    occurrences = stops.get(node_id)
+    if not occurrences:
+        return None
+    chosen = next((s for s in occurrences if after is None or s > after), occurrences[0])
+    occurrences.remove(chosen)
+    return chosen
+
+
+def _spliceSaving(route: Sequence[str], pos: int, distance: Distance) -> int:
+    prev_id, node_id, next_id = route[pos - 1], route[pos], route[pos + 1]
+    return (distance(prev_id, node_id) + distance(node_id, next_id)
+            - distance(prev_id, next_id))
+
+
+def removalSavings(routes: Sequence[Sequence[str]],
+                   pairs: Sequence[Tuple[str, str]],
+                   distance: Distance) -> List[int]:
+    """
+    Distance saved by splicing each (pickup, delivery) pair out of the
+    current routes, all other stops kept in place – O(1) per pair.
+    Pairs that are not on any route save nothing.
+    """
+    stops = _locateStops(routes)
+    savings: List[int] = []
+
+    for pickup_id, delivery_id in pairs:
+        pickup = _takeStop(stops, pickup_id)
+        delivery = _takeStop(stops, delivery_id, after=pickup)
+        if pickup is None or delivery is None:
+            savings.append(0)
+            continue
+
+        (r_p, i), (r_d, j) = sorted([pickup, delivery])
+        route = routes[r_p]
+        if r_p == r_d and j == i + 1:
+            # adjacent stops leave as one block
+            saving = (distance(route[i - 1], route[i]) + distance(route[i], route[j])
+                      + distance(route[j], route[j + 1]) - distance(route[i - 1], route[j + 1]))
+        else:
+            saving = _spliceSaving(route, i, distance) + _spliceSaving(routes[r_d], j, distance)
+        savings.append(saving)
+
+    return savings
+
+
+def _openRoute(route: Sequence[str], depot_id: str = None) -> List[str]:
+    """Route from start to (first) end depot; solved routes repeat the end."""
+    if not route:
+        return [depot_id, depot_id] if depot_id is not None else []
+    route = list(route)
+    while len(route) > 2 and route[-1] == route[-2]:
+        route.pop()
+    return route
+
+
+def stopLoads(route: Sequence[str], orders: Sequence[Tuple[str, str, int]]) -> List[int]:
+    """
+    Load change at every stop of one route: +load at an order's pickup,
+    -load at its delivery, matched like removalSavings. Depots, and
+    orders that are not on the route, count 0.
+    """
+    stops = _locateStops([route])
+    loads = [0] * len(route)
+    for pickup_id, delivery_id, load in orders:
+        pickup = next(iter(stops.get(pickup_id, ())), None)
+        delivery = next((s for s in stops.get(delivery_id, ()) if pickup is not None and s > pickup), None)
+        if delivery is None:
+            continue
+        stops[pickup_id].remove(pickup)
+        stops[delivery_id].remove(delivery)
+        loads[pickup[1]] += load
+        loads[delivery[1]] -= load
+    return loads
+
+
+def _inserted(seq: Sequence[str], pickup_id: str, delivery_id: str, k: int, m: int) -> List[str]:
+    """seq with the pickup on edge k and the delivery on edge m (k <= m)."""
+    seq = list(seq)
+    seq.insert(m + 1, delivery_id)
+    seq.insert(k + 1, pickup_id)
+    return seq
+
+
+def _insertions(seq: Sequence[str], pickup_id: str, delivery_id: str,
+                distance: Distance) -> List[Tuple[int, int, int]]:
+    """(extra distance, pickup edge, delivery edge) of every insertion into seq."""
+    edges = range(len(seq) - 1)
+    direct = [distance(seq[k], seq[k + 1]) for k in edges]
+    pickup_cost = [distance(seq[k], pickup_id) + distance(pickup_id, seq[k + 1]) - direct[k] for k in edges]
+    delivery_cost = [distance(seq[k], delivery_id) + distance(delivery_id, seq[k + 1]) - direct[k] for k in edges]
+    options = []
+    for k in edges:
+        options.append((distance(seq[k], pickup_id) + distance(pickup_id, delivery_id)
+                        + distance(delivery_id, seq[k + 1]) - direct[k], k, k))
+        options.extend((pickup_cost[k] + delivery_cost[m], k, m) for m in range(k + 1, len(seq) - 1))
+    return options
+
+
+def cheapestInsertion(routes: Sequence[Sequence[str]],
+                      pickup_id: str,
+                      delivery_id: str,
+                      distance: Distance,
+                      depot_id: str = None,
+                      fits: Optional[Fits] = None) -> Tuple[int, int, int, int]:
+    """
+    Cheapest feasible insertion of one (pickup, delivery) pair, pickup
+    before delivery on the same route – O(route) per route using a running
+    minimum over the pickup positions. With fits, a cheapest insertion
+    that breaks the route's limits makes way for the next cheapest one
+    that does not (O(route²) candidates, tried in order of cost).
+
+    Returns (extra distance, route, pickup edge, delivery edge); edge k
+    means "between stop k and stop k+1" of the route without its repeated
+    end depot. Extra distance is None if no route can take the pair.
+    """
+    best = _cheapestUnchecked(routes, pickup_id, delivery_id, distance, depot_id)
+    if fits is None or best[0] is None:
+        return best
+
+    extra, r, k, m = best
+    if fits(r, _inserted(_openRoute(routes[r], depot_id), pickup_id, delivery_id, k, m)):
+        return best
+
+    candidates = sorted((extra, r, k, m)
+                        for r, route in enumerate(routes)
+                        for extra, k, m in _insertions(_openRoute(route, depot_id), pickup_id, delivery_id, distance))
+    for extra, r, k, m in candidates:
+        if fits(r, _inserted(_openRoute(routes[r], depot_id), pickup_id, delivery_id, k, m)):
+            return extra, r, k, m
+    return None, -1, -1, -1
+
+
+def _cheapestUnchecked(routes: Sequence[Sequence[str]], pickup_id: str, delivery_id: str,
+                       distance: Distance, depot_id: str = None) -> Tuple[int, int, int, int]:
+    best = (None, -1, -1, -1)
+
+    for r, route in enumerate(routes):
+        seq = _openRoute(route, depot_id)
+        best_pickup = None      # (cost, edge) of the cheapest pickup edge so far
+
+        for k in range(len(seq) - 1):
+            a, b = seq[k], seq[k + 1]
+            direct = distance(a, b)
+
+            # pickup and delivery back to back on edge k
+            together = distance(a, pickup_id) + distance(pickup_id, delivery_id) + distance(delivery_id, b) - direct
+            if best[0] is None or together < best[0]:
+                best = (together, r, k, k)
+
+            # delivery on edge k, pickup on an earlier edge
+            if best_pickup is not None:
+                apart = best_pickup[0] + distance(a, delivery_id) + distance(delivery_id, b) - direct
+                if apart < best[0]:
+                    best = (apart, r, best_pickup[1], k)
+
+            pickup_cost = distance(a, pickup_id) + distance(pickup_id, b) - direct
+            if best_pickup is None or pickup_cost < best_pickup[0]:
+                best_pickup = (pickup_cost, k)
+
+    return best
+
+
+def insertOrder(routes: Sequence[Sequence[str]],
+                pickup_id: str,
+                delivery_id: str,
+                distance: Distance,
+                depot_id: str = None,
+                fits: Optional[Fits] = None) -> Tuple[int, List[List[str]]]:
+    """Apply cheapestInsertion and return (extra distance, new routes)."""
+    extra, r, k, m = cheapestInsertion(routes, pickup_id, delivery_id, distance, depot_id, fits)
+    new_routes = [list(route) for route in routes]
+    if extra is None:
+        return extra, new_routes
+
+    seq = _inserted(_openRoute(routes[r], depot_id), pickup_id, delivery_id, k, m)
+    new_routes[r] = seq + seq[-1:]      # keep the solver's repeated end depot
+    return extra, new_routes
@@ -6,6 +6,7 @@ from ortools.constraint_solver import pywrapcp
 import pandas
 
 from models import nodeUtilities
+from models.pickupDelivery import register_arc_costs
 
 def create_data_model(demands:list[int]):
     """Stores the data for the problem."""
@@ -96,7 +97,7 @@ def print_solution(data, manager, routing, solution) -> dict:
 
     return resolved_solution
 
-def solve_CVRP_problem(demand_for_each_nodes:list[int]) -> dict:
+def solve_CVRP_problem(demand_for_each_nodes:list[int], arc_evaluator:str = "matrix") -> dict:
     """Solve the CVRP problem."""
 
     # Instantiate the data problem.
@@ -110,27 +111,14 @@ def solve_CVRP_problem(demand_for_each_nodes:list[int]) -> dict:
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    # Create and register a transit callback.
-    def distance_callback(from_index, to_index):
-        """Returns the distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["distance_matrix"][from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    # Register the distance matrix (natively unless arc_evaluator="callback").
+    transit_callback_index = register_arc_costs(routing, manager, data["distance_matrix"], arc_evaluator)
 
     # Define cost of each arc.
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
     # Add Capacity constraint.
-    def demand_callback(from_index):
-        """Returns the demand of the node."""
-        # Convert from routing variable Index to demands NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        return data["demands"][from_node]
-
-    demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
+    demand_callback_index = routing.RegisterUnaryTransitVector(data["demands"])
     routing.AddDimensionWithVehicleCapacity(
         demand_callback_index,
         0,  # null capacity slack
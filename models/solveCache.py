@@ -0,0 +1,100 @@
+"""
+Memoized PnD solve results.
+
+Key: (frozenset of orders, depot, solver params, node/matrix version).
+In-memory LRU tier with hit/miss counters, plus an optional on-disk tier
+(one JSON file per key) so repeated simulations of a scenario skip solving.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class SolveCache:
+    def __init__(self, maxsize: int = 1024, disk_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ── keys ────────────────────────────────────────────────────────────
+    @staticmethod
+    def key(orders, depot_id: str, params: tuple, version) -> tuple:
+        return (frozenset(tuple(order) for order in orders), depot_id, params, version)
+
+    def _diskPath(self, key: tuple) -> str:
+        canonical = json.dumps([sorted(key[0]), key[1], list(key[2]), key[3]], default=str)
+        return os.path.join(self.disk_dir, hashlib.sha1(canonical.encode()).hexdigest() + ".json")
+
+    # ── lookups ─────────────────────────────────────────────────────────
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(result)
+
+        if self.disk_dir:
+            path = self._diskPath(key)
+            if os.path.exists(path):
+                with open(path) as f:
+                    result = json.load(f)
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, result)
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, result: dict) -> None:
+        if result is None:
+            return
+        self._remember(key, copy.deepcopy(result))
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._diskPath(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key: tuple, result: dict) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # ── housekeeping ────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits,
+                    "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+
+# process-wide cache used by models.pickupDelivery.solve_PnD
+SOLVE_CACHE = SolveCache()
+
+
+def configureSolveCache(maxsize: int = 1024, disk_dir: Optional[str] = None) -> SolveCache:
+    """Replace the process-wide cache, e.g. to turn on the on-disk tier."""
+    global SOLVE_CACHE
+    SOLVE_CACHE = SolveCache(maxsize, disk_dir)
+    return SOLVE_CACHE
@@ -0,0 +1,152 @@
+"""
+Solver configuration for the PnD model.
+
+    num_vehicles        trucks in the carrier's fleet, all based at the depot
+    vehicle_capacities  load limit per truck (an int applies to every truck),
+                        None = uncapacitated; an order loads order[3] units
+                        when the row has a fourth column, else one
+    time_windows        node ID -> (earliest, latest) arrival; travel time is
+                        distance / speed plus service_time at every stop
+    horizon             latest end of any route, None = long enough for
+                        every route (timeHorizon)
+    metaheuristic       OR-Tools LocalSearchMetaheuristic name; anything but
+                        AUTOMATIC / GREEDY_DESCENT needs a time_limit
+    time_limit          seconds per search; capacitated or timed configs
+                        default to CONSTRAINED_TIME_LIMIT, so a hard or
+                        infeasible instance cannot stall a model step
+
+SolverConfig() reproduces the original single-truck model.
+"""
+
+import math
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from ortools.constraint_solver import routing_enums_pb2
+
+# metaheuristics that stop on their own once no move improves the route
+_CONVERGING = ("AUTOMATIC", "GREEDY_DESCENT")
+# default search limit (seconds) once capacities or time windows are set
+CONSTRAINED_TIME_LIMIT = 10.0
+
+
+class SolverConfig:
+    def __init__(self, num_vehicles: int = 1,
+                 vehicle_capacities: Union[int, Sequence[int], None] = None,
+                 max_route_distance: int = 8000,
+                 span_cost_coefficient: int = 100,
+                 time_windows: Optional[Dict[str, Tuple[int, int]]] = None,
+                 speed: float = 1.0,
+                 service_time: int = 0,
+                 horizon: Optional[int] = None,
+                 first_solution_strategy: str = "PARALLEL_CHEAPEST_INSERTION",
+                 metaheuristic: str = "AUTOMATIC",
+                 time_limit: Optional[float] = None):
+        if num_vehicles < 1:
+            raise ValueError("a fleet needs at least one vehicle")
+        if isinstance(vehicle_capacities, int):
+            vehicle_capacities = [vehicle_capacities] * num_vehicles
+        if vehicle_capacities is not None and len(vehicle_capacities) != num_vehicles:
+            raise ValueError(f"{len(vehicle_capacities)} capacities for {num_vehicles} vehicles")
+        if not hasattr(routing_enums_pb2.FirstSolutionStrategy, first_solution_strategy):
+            raise ValueError(f"unknown first solution strategy: {first_solution_strategy}")
+        if not hasattr(routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic):
+            raise ValueError(f"unknown metaheuristic: {metaheuristic}")
+        if time_limit is None and (vehicle_capacities is not None or time_windows):
+            time_limit = CONSTRAINED_TIME_LIMIT
+        if metaheuristic not in _CONVERGING and time_limit is None:
+            raise ValueError(f"{metaheuristic} never stops on its own, set a time_limit")
+
+        self.num_vehicles = num_vehicles
+        self.vehicle_capacities = list(vehicle_capacities) if vehicle_capacities is not None else None
+        self.max_route_distance = max_route_distance
+        self.span_cost_coefficient = span_cost_coefficient
+        self.time_windows = dict(time_windows or {})
+        self.speed = speed
+        self.service_time = service_time
+        self.horizon = horizon
+        self.first_solution_strategy = first_solution_strategy
+        self.metaheuristic = metaheuristic
+        self.time_limit = time_limit
+
+    @property
+    def timed(self) -> bool:
+        return bool(self.time_windows)
+
+    def key(self) -> tuple:
+        """Hashable identity of the settings, part of the solve cache key."""
+        return (self.num_vehicles, tuple(self.vehicle_capacities or ()), self.max_route_distance,
+                self.span_cost_coefficient, tuple(sorted(self.time_windows.items())), self.speed,
+                self.service_time, self.horizon, self.first_solution_strategy, self.metaheuristic,
+                self.time_limit)
+
+    # ── model data ──────────────────────────────────────────────────────
+    @staticmethod
+    def orderLoad(order) -> int:
+        return int(order[3]) if len(order) > 3 and order[3] != "" else 1
+
+    def travelTimes(self, distance_matrix: Sequence[Sequence[int]], depot: int) -> list[list[int]]:
+        """Travel time between every pair of nodes, service at the origin included."""
+        times = []
+        for from_node, row in enumerate(distance_matrix):
+            service = 0 if from_node == depot else self.service_time
+            times.append([math.ceil(distance / self.speed) + service for distance in row])
+        return times
+
+    def timeHorizon(self, time_matrix: Sequence[Sequence[int]]) -> int:
+        """
+        Capacity of the Time dimension, i.e. the latest a route may end.
+        Defaults to the latest window close plus the longest leg out of
+        every node (service included), which no route can exceed; the
+        windows themselves are enforced per stop.
+        """
+        if self.horizon is not None:
+            return self.horizon
+        route_bound = sum(max(row, default=0) for row in time_matrix)
+        latest = max((close for _, close in self.time_windows.values()), default=0)
+        return latest + route_bound
+
+    # ── route checks ────────────────────────────────────────────────────
+    def routeFits(self, route: Sequence[str], loads: Sequence[int], distance, vehicle: int = 0) -> bool:
+        """
+        Whether one route (node IDs, start to end depot) keeps to the limits
+        the solver is given: max_route_distance, the vehicle's capacity and
+        the time windows. loads[i] is the load picked up (+) or dropped (-)
+        at route[i]; distance(from_ID, to_ID) is the arc cost.
+        """
+        legs = [distance(a, b) for a, b in zip(route, route[1:])]
+        if sum(legs) > self.max_route_distance:
+            return False
+
+        if self.vehicle_capacities is not None:
+            capacity, load = self.vehicle_capacities[vehicle], 0
+            for change in loads:
+                load += change
+                if load > capacity:
+                    return False
+
+        if self.timed and route:
+            depot = route[0]
+            latest = self.horizon if self.horizon is not None else math.inf
+            clock = self.time_windows.get(depot, (0, latest))[0]
+            for a, b, leg in zip(route, route[1:], legs):
+                clock += math.ceil(leg / self.speed) + (0 if a == depot else self.service_time)
+                open_time, close_time = self.time_windows.get(b, (0, latest))
+                clock = max(clock, open_time)       # wait for the window to open
+                if b != depot and clock > close_time:
+                    return False
+        return True
+
+    # ── search ──────────────────────────────────────────────────────────
+    def applyTo(self, search_parameters, time_limit: Optional[float] = None) -> None:
+        """Copy the heuristics and the time limit (argument wins) onto the parameters."""
+        search_parameters.first_solution_strategy = getattr(
+            routing_enums_pb2.FirstSolutionStrategy, self.first_solution_strategy)
+        search_parameters.local_search_metaheuristic = getattr(
+            routing_enums_pb2.LocalSearchMetaheuristic, self.metaheuristic)
+        if time_limit is None:
+            time_limit = self.time_limit
+        if time_limit is not None:
+            search_parameters.time_limit.FromMilliseconds(int(time_limit * 1000))
+
+
+DEFAULT_CONFIG = SolverConfig()
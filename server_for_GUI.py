@@ -1,17 +1,21 @@
 # server_for_GUI.py
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 import os
 import json
-import subprocess
-#import time
+import time
 import threading
+import uuid
 import mimetypes 
-from models.pickupDelivery import solve_PnD_problem
+from concurrent.futures import ThreadPoolExecutor
+from models import metrics, node
+from models.orderBook import Order
+from models.pickupDelivery import solve_PnD
+from auction.runner import RUN_OUTPUT_DIR, SimulationRunner
+from auction.snapshot_store import SnapshotStore
 #from auction.core import CarrierModel
 
 
-RUNNING_FLAG = {"running": False} 
 profit_before = 0
 profit_after  = 0
 
@@ -21,6 +25,35 @@ mimetypes.add_type('text/html', '.html')
 mimetypes.add_type('text/csv', '.csv')
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PATH_CARRIERS_INFO = os.path.join(BASE_DIR, "auction", "carriers_info")
+DEFAULT_META = {"finished": False,
+                "running": False,
+                "profit_before_total": 0,
+                "profit_after_total": 0,
+                "profit_before": {},
+                "profit_after": {}}
+# snapshots of runs started outside the server (python -m auction.run_one,
+# written to RUN_OUTPUT_DIR), fed by a single watcher thread; ETags and SSE
+# event IDs carry BOOT_ID so versions from before a restart never match
+STORE = SnapshotStore(RUN_OUTPUT_DIR)
+BOOT_ID = uuid.uuid4().hex[:8]
+WATCH_INTERVAL = 0.5    # seconds between looks at the snapshot log
+
+# /calculate_route: solves run on a bounded pool, at most ROUTE_QUEUE_LIMIT
+# distinct selections queued; identical ones share a solve
+WAREHOUSE_ID = "N99"    # the GUI draws this ID at the warehouse location
+ROUTE_WORKERS = 4
+ROUTE_QUEUE_LIMIT = 32
+ROUTE_POOL = ThreadPoolExecutor(max_workers=ROUTE_WORKERS, thread_name_prefix="route")
+_ROUTE_INFLIGHT = {}    # (warehouse, stops) -> Future
+_ROUTE_LOCK = threading.Lock()
+
+# runs started from the GUI: in this process, warm, several at once; a run
+# may only name a scenario file under PATH_SCENARIOS
+MAX_RUNS = 2
+PATH_SCENARIOS = os.path.join(BASE_DIR, "auction", "scenarios")
+AUCTION_MODES = ("single", "bundle")
+RUNNER = SimulationRunner(max_workers=MAX_RUNS)
 app = Flask(__name__, static_folder=os.path.join(BASE_DIR, 'GUI'), static_url_path='/')
 app.static_folder_agent = os.path.join(BASE_DIR, 'models')
 
@@ -28,6 +61,23 @@ print(f"DEBUG: BASE_DIR is: {BASE_DIR}")
 print(f"DEBUG: app.static_folder is: {app.static_folder}")
 print(f"DEBUG: app.static_folder_models is: {app.static_folder_agent}")
 
+# per-endpoint timings, recorded when metrics are on (CCN_METRICS=1)
+@app.before_request
+def _start_timer():
+    request.environ["ccn.start"] = time.perf_counter()
+
+@app.after_request
+def _record_timing(response):
+    start = request.environ.get("ccn.start")
+    if start is not None and request.url_rule is not None:
+        metrics.observe(f"gui{request.url_rule.rule}", time.perf_counter() - start)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text format; includes the in-process simulation runs."""
+    return Response(metrics.toPrometheus(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/')
 def index():
     return send_from_directory('GUI', 'index.html', mimetype='text/html')
@@ -55,61 +105,136 @@ def serve_models_static(filename):
         return "File not found", 404 
     return send_from_directory(app.static_folder_agent, filename)
 
+class RouteQueueFull(Exception):
+    pass
+
+def _solve_selection(warehouse:tuple, stops:tuple) -> dict:
+    """One truck from the warehouse (node N99) through the stops, built in memory."""
+    node_table = {ID: node.Node(ID, ID, x, y) for ID, x, y in stops}
+    node_table[WAREHOUSE_ID] = node.Node(WAREHOUSE_ID, "WAREHOUSE", *warehouse)
+    # pickup = delivery: each stop is a plain visit; the solve cache keeps the result
+    orders = [Order(f"O{idx:02}", ID, ID) for idx, (ID, _, _) in enumerate(stops)]
+    return solve_PnD(orders, node_table, depot_id=WAREHOUSE_ID)
+
+def route_for_selection(warehouse:tuple, stops:tuple) -> dict:
+    """Solve on ROUTE_POOL; identical selections in flight share one solve. None if infeasible."""
+    key = (warehouse, tuple(sorted(stops)))
+    with _ROUTE_LOCK:
+        future = _ROUTE_INFLIGHT.get(key)
+        created = future is None
+        if created:
+            if len(_ROUTE_INFLIGHT) >= ROUTE_QUEUE_LIMIT:
+                raise RouteQueueFull()
+            future = _ROUTE_INFLIGHT[key] = ROUTE_POOL.submit(_solve_selection, *key)
+    if created:
+        future.add_done_callback(lambda _: _forget_route(key))
+    return future.result()
+
+def _forget_route(key:tuple) -> None:
+    with _ROUTE_LOCK:
+        _ROUTE_INFLIGHT.pop(key, None)
+
 @app.route('/calculate_route', methods=['POST'])
 def calculate_route():
     """Simulate best route for user‑selected nodes using our Pickup‑and‑Delivery model."""
-    payload = request.get_json()
+    payload = request.get_json(silent=True) or {}
     warehouse = payload.get("warehouse")      # {'x':…, 'y':…}
     nodes     = payload.get("nodes")          # [{'id':…, 'x':…, 'y':…}, …]
 
     if not warehouse or not nodes:
         return jsonify({"error": "Missing warehouse or nodes"}), 400
-    
-    # --- create temporary CSVs ---------------------------------
-    import csv, tempfile
-    tmp_dir = tempfile.mkdtemp()
-    order_csv = os.path.join(tmp_dir, "orders.csv")
-    tm_csv    = os.path.join(tmp_dir, "travelMatrix.csv")
-
-    # Write orders: each node pair is just (pickup, delivery) => same id twice
-    with open(order_csv, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["Order ID(pk)", "pickup", "delivery"])
-        for idx, n in enumerate(nodes):
-            w.writerow([f"O{idx:02}", n["id"], n["id"]])   # trivial pair
-
-    # Use nodeUtilities to update the travel matrix incl. depot N99
-    import models.nodeUtilities as nu
-    nu.addWarehouseInfoToCSV(warehouse["x"], warehouse["y"])        # writes N99 line
-    nu.writeTravelMatrix(nu.readNodeInformation("nodeInfoFromGUI.csv"), tm_csv)
-
-    # --- solve with 1 vehicle ----------------------------------
-    res = solve_PnD_problem(os.path.basename(order_csv), os.path.basename(tm_csv))
-    res["warehouse_location"] = [warehouse["x"], warehouse["y"]]
-    return jsonify(res)
+    try:
+        depot = (int(warehouse["x"]), int(warehouse["y"]))
+        stops = tuple((str(n["id"]), int(n["x"]), int(n["y"])) for n in nodes)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "warehouse and nodes need numeric x and y, nodes an id"}), 400
+
+    # --- solve with 1 vehicle, no files touched ---------------
+    try:
+        res = route_for_selection(depot, stops)
+    except RouteQueueFull:
+        return jsonify({"error": "Too many route requests, try again"}), 503
+    if res is None:
+        return jsonify({"error": "No route visits these nodes within the route distance limit"}), 422
+    return jsonify({**res, "warehouse_location": [warehouse["x"], warehouse["y"]]})
 
     
-@app.route('/show_auction_result', methods=['POST'])
-def run_auction():
+def snapshot_carrier_ids(carriers_dir:str) -> list[str]:
+    """Carriers of the run, from the model's _carriers.json or else the *_vrp.json files present."""
+    index = os.path.join(carriers_dir, "_carriers.json")
+    if os.path.exists(index):
+        with open(index) as f:
+            return json.load(f)["carriers"]
+    IDs = [name[:-len("_vrp.json")] for name in os.listdir(carriers_dir) if name.endswith("_vrp.json")]
+    return sorted(IDs, key=lambda ID: (len(ID), ID))
 
-    # PATH
-    PATH_C0 = "auction/carriers_info/C0_vrp.json"
-    PATH_C1 = "auction/carriers_info/C1_vrp.json"
-    PATH_C2 = "auction/carriers_info/C2_vrp.json"
-    # os.path.dirname(os.path.abspath(__file__))
-    # PATH_INPUT = os.path.join(PATH_MODELS, 'input')
+def read_snapshots(carriers_dir:str) -> list[dict]:
+    """One snapshot per carrier, {} for carriers that have none yet."""
+    snapshots = []
+    for ID in snapshot_carrier_ids(carriers_dir):
+        path = os.path.join(carriers_dir, f"{ID}_vrp.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                snapshots.append({"carrier_id": ID, **json.load(f)})
+        else:
+            snapshots.append({})
+    return snapshots
 
-    list_of_results:list[dict] = []
-    with open(PATH_C0, "r") as f:
-        list_of_results.append(json.load(f))
+def _watch_snapshots():
+    while True:
+        try:
+            STORE.refresh()
+        except (OSError, ValueError) as e:      # a file mid-write; next round gets it
+            print("Snapshot refresh failed:", e)
+        time.sleep(WATCH_INTERVAL)
 
-    with open(PATH_C1, "r") as f:
-        list_of_results.append(json.load(f))
+# snapshots already on disk (an earlier run, else the starting routes
+# shipped in carriers_info), then follow the log
+STORE.update({snap["carrier_id"]: snap
+              for snap in read_snapshots(RUN_OUTPUT_DIR if os.path.isdir(RUN_OUTPUT_DIR) else PATH_CARRIERS_INFO)
+              if snap})
+threading.Thread(target=_watch_snapshots, daemon=True).start()
 
-    with open(PATH_C2, "r") as f:
-        list_of_results.append(json.load(f))
+def store_for(job_id:str = None):
+    """(store, ETag prefix) of the given job, else the latest job, else the watched run output."""
+    job = RUNNER.get(job_id) if job_id else RUNNER.latest()
+    if job_id and job is None:
+        return None, None
+    if job is None:
+        return STORE, BOOT_ID
+    return job.store, f"{BOOT_ID}-{job.job_id}"
 
-    print(list_of_results)
+def _scenario_path(name) -> str:
+    """The scenario JSON `name` names under PATH_SCENARIOS; ValueError for anything else."""
+    root = os.path.realpath(PATH_SCENARIOS)
+    path = os.path.realpath(os.path.join(root, str(name)))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError(f"no scenario {name!r} under auction/scenarios")
+    return path
+
+def _run_settings(payload:dict) -> dict:
+    """RUNNER.submit arguments from a request body; ValueError on a bad field."""
+    try:
+        ticks = int(payload.get("ticks", 20))
+        delay = float(payload.get("delay", 1.0))
+    except (TypeError, ValueError):
+        raise ValueError("ticks must be an integer and delay a number")
+    if ticks < 1 or delay < 0:
+        raise ValueError("ticks must be at least 1 and delay not negative")
+    auction_mode = payload.get("auction_mode", "single")
+    if auction_mode not in AUCTION_MODES:
+        raise ValueError(f"auction_mode must be one of {', '.join(AUCTION_MODES)}")
+    scenario = payload.get("scenario")
+    return {"scenario_path": _scenario_path(scenario) if scenario is not None else None,
+            "ticks": ticks,
+            "delay": delay,
+            "auction_mode": auction_mode}
+
+@app.route('/show_auction_result', methods=['POST'])
+def run_auction():
+    store, _ = store_for(request.args.get("job"))
+    list_of_results:list[dict] = store.state()[1] if store else []
+    print(f"{len(list_of_results)} carrier snapshots")
 
     try:
         return jsonify(list_of_results)
@@ -119,33 +244,97 @@ def run_auction():
 
 @app.route('/run_one_auction', methods=['POST'])
 def run_one_auction():
-    if RUNNING_FLAG["running"]:
-        return jsonify({"started": False, "running": True})
-    RUNNING_FLAG["running"] = True
+    """
+    Start a run in the simulation runner; optional {"scenario", "ticks",
+    "delay", "auction_mode"}, default 20 ticks of the three carriers one
+    second apart. "scenario" is a path under auction/scenarios. Runs
+    queue behind the MAX_RUNS already going.
+    """
+    try:
+        settings = _run_settings(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = RUNNER.submit(**settings)
+    return jsonify({"started": True, "running": True, "job_id": job.job_id})
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify([job.info() for job in RUNNER.jobs()])
 
-    def _worker():
-        subprocess.run(["python3", "-m", "auction.run_one", "20", "1.0"])
-        RUNNING_FLAG["running"] = False
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        settings = _run_settings(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = RUNNER.submit(**settings)
+    return jsonify(job.info()), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = RUNNER.get(job_id)
+    return (jsonify(job.info()), 200) if job else (jsonify({"error": "no such job"}), 404)
 
-    threading.Thread(target=_worker, daemon=True).start()
-    return jsonify({"started": True, "running": True})
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = RUNNER.get(job_id)
+    if job is None:
+        return jsonify({"error": "no such job"}), 404
+    job.cancel()
+    return jsonify(job.info())
 
 @app.route('/api/carrier_routes', methods=['GET'])
 def get_carrier_routes():
-    result_list = []
-    for i in range(3):
-        path = f"auction/carriers_info/C{i}_vrp.json"
-        result_list.append(json.load(open(path))) if os.path.exists(path) else result_list.append({})
-    # read profit meta
-    meta_path = "auction/carriers_info/_meta.json"
-    meta = json.load(open(meta_path)) if os.path.exists(meta_path) else {"finished": False,
-                                                                        "profit_before_total": 0,
-                                                                        "profit_after_total": 0,
-                                                                        "profit_before": {},
-                                                                        "profit_after": {}}
-    meta["running"] = RUNNING_FLAG["running"]
+    """
+    Every snapshot plus profit meta of ?job= (default the latest run); 304
+    when If-None-Match has the current version.
+    """
+    store, tag = store_for(request.args.get("job"))
+    if store is None:
+        return jsonify({"error": "no such job"}), 404
+    version, result_list, stored_meta = store.state()
+    etag = f"{tag}-{version}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    meta = {**DEFAULT_META, **stored_meta}
+    meta["version"] = version
     meta["snapshots"] = result_list
-    return jsonify(meta)
+    response = jsonify(meta)
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/carrier_routes/stream', methods=['GET'])
+def stream_carrier_routes():
+    """
+    Server-Sent Events: one "routes" event per change with the carriers that
+    changed ({"version", "full", "carriers", "meta"}; full = all carriers)
+    for ?job= (default the latest run). A reconnecting client resumes
+    from its Last-Event-ID.
+    """
+    store, tag = store_for(request.args.get("job"))
+    if store is None:
+        return jsonify({"error": "no such job"}), 404
+    last_id = request.headers.get("Last-Event-ID", "")
+    try:
+        version = int(last_id.rsplit("-", 1)[1]) if last_id.startswith(f"{tag}-") else 0
+    except (ValueError, IndexError):
+        version = 0     # not an ID of ours: start from a full snapshot
+
+    def events(version):
+        while True:
+            changes = store.wait(version, timeout=15)
+            if changes is None:
+                yield ": keep-alive\n\n"
+                continue
+            version = changes["version"]
+            changes["meta"] = {**DEFAULT_META, **changes["meta"]}
+            yield f"id: {tag}-{version}\nevent: routes\ndata: {json.dumps(changes)}\n\n"
+
+    return Response(events(version), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 if __name__ == '__main__':
     app.run(host='localhost', port=8001, debug=True) # debug=False when public the project
\ No newline at end of file
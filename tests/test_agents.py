@@ -0,0 +1,50 @@
+import csv
+
+import pytest
+
+pytest.importorskip("mesa")
+pytest.importorskip("ortools")
+
+from auction.agents import CarrierAgent
+from models.orderBook import Order, OrderBook
+from models.solverConfig import SolverConfig
+
+NODES = [("W0", 0, 0), ("N1", 100, 0), ("N2", 100, 100), ("N3", 5000, 0), ("N4", 5000, 100)]
+
+
+@pytest.fixture
+def carrier(tmp_path):
+    node_file = tmp_path / "nodes.csv"
+    with open(node_file, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Node_ID", "Node_Name", "x", "y"])
+        w.writerows([ID, ID, x, y] for ID, x, y in NODES)
+    OrderBook([Order("O1", "N1", "N2")], str(tmp_path / "orderC0.csv")).save()
+    books = {"C1": OrderBook()}
+    return CarrierAgent(0, None, "C0", "orderC0.csv", "travelMatrixC0.csv", 1.0, 1.4, 2.0, 1.0,
+                        depot_coord=(0, 0), solver_config=SolverConfig(max_route_distance=1000),
+                        carriers_dir=str(tmp_path), order_books=books, depot_id="W0",
+                        node_file=str(node_file))
+
+
+def test_won_order_without_a_route_is_handed_back(carrier):
+    solution = carrier.cost_model.solution
+    won = {"req_id": "R1", "seller_id": "C1", "winner_id": "C0",
+           "order_pk": "O2", "node_id": "N3", "delivery": "N4"}
+    assert carrier.on_results([won]) == [("C1", Order("O2", "N3", "N4"))]
+    assert carrier.order_book.rows() == [Order("O1", "N1", "N2")]
+    assert carrier.cost_model.solution["route_map_ID"] == solution["route_map_ID"]
+
+
+def test_won_order_with_a_route_is_kept(carrier):
+    won = {"req_id": "R1", "seller_id": "C1", "winner_id": "C0",
+           "order_pk": "O3", "node_id": "N2", "delivery": "N1"}
+    assert carrier.on_results([won]) == []
+    assert "O3" in carrier.order_book
+
+
+def test_carrier_without_orders_does_not_offer(carrier):
+    carrier.order_book.remove("O1")
+    carrier.cost_model.invalidate()
+    assert not carrier.can_offer
+    assert carrier.on_offer() is False
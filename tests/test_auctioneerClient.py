@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from auction.network.auctioneer_client import AuctioneerClient
+
+
+def test_only_idempotent_requests_are_retried_on_5xx():
+    retry = AuctioneerClient().session.get_adapter("http://localhost:8000").max_retries
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
@@ -0,0 +1,51 @@
+import os
+import shutil
+
+import pytest
+
+from auction.clock import AuctionClock
+
+
+def test_events_come_due_by_tick_then_scheduling_order():
+    clock = AuctionClock()
+    clock.schedule(6, "results", ["C0"])
+    clock.schedule(2, "offer", ["C0", "C1"])
+    clock.schedule(5, "close", ["auctioneer"])
+    clock.schedule(3, "bid", ["C1"])
+    clock.schedule(5, "results", ["C1"])
+    clock.schedule(4, "bid", [])                # nobody concerned: not queued
+    assert len(clock) == 5
+
+    assert clock.due(1) == []
+    assert [(e.tick, e.kind) for e in clock.due(3)] == [(2, "offer"), (3, "bid")]
+    assert [(e.tick, e.kind) for e in clock.due(5)] == [(5, "close"), (5, "results")]
+    [event] = clock.due(10)
+    assert (event.tick, event.kind, event.agents) == (6, "results", ["C0"])
+    assert len(clock) == 0
+
+
+def test_model_runs_the_auction_cycle_in_order(tmp_path, monkeypatch):
+    pytest.importorskip("mesa")
+    pytest.importorskip("ortools")
+    from auction.core import CarrierModel
+    from auction.scenario import defaultScenario
+
+    scenario = defaultScenario()
+    for spec in scenario.carriers:
+        shutil.copy(os.path.join(scenario.carriers_dir, spec.order_csv), tmp_path)
+    model = CarrierModel(transport="inprocess", scenario=scenario.withCarriersDir(str(tmp_path)),
+                         write_snapshots=False, persist_every=None, seed=0)
+    dispatched = []
+    due = model.clock.due
+
+    def recording_due(tick):
+        events = due(tick)
+        dispatched.extend((event.tick, event.kind) for event in events)
+        return events
+    monkeypatch.setattr(model.clock, "due", recording_due)
+
+    for _ in range(12):
+        model.step()
+    # open (offer) → bid → bid deadline (close) → results → next offer
+    assert dispatched == [(2, "offer"), (3, "bid"), (5, "close"), (6, "results"),
+                          (7, "offer"), (8, "bid"), (10, "close"), (11, "results"), (12, "offer")]
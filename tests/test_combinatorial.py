@@ -0,0 +1,48 @@
+import itertools
+import random
+
+import pytest
+
+from auction.network.combinatorial import vcg_payments, winner_determination
+
+ITEMS = ["A", "B", "C", "D", "E"]
+
+
+def random_bids(rng):
+    return [{"carrier_id": f"C{rng.randrange(4)}",
+             "items": rng.sample(ITEMS, rng.randint(1, 3)),
+             "value": round(rng.uniform(1, 100), 1)}
+            for _ in range(rng.randint(1, 9))]
+
+
+def brute_force(bids):
+    """Best total value over every set of XOR-compatible bids."""
+    best = 0.0
+    for size in range(1, len(bids) + 1):
+        for chosen in itertools.combinations(bids, size):
+            items = [item for bid in chosen for item in bid["items"]]
+            carriers = [bid["carrier_id"] for bid in chosen]
+            if len(set(items)) == len(items) and len(set(carriers)) == len(carriers):
+                best = max(best, sum(bid["value"] for bid in chosen))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_winner_determination_matches_brute_force(seed):
+    bids = random_bids(random.Random(seed))
+    welfare, winners = winner_determination(bids, ITEMS)
+    assert welfare == pytest.approx(brute_force(bids))
+    assert welfare == pytest.approx(sum(bids[w]["value"] for w in winners))
+    sold = [item for w in winners for item in bids[w]["items"]]
+    assert len(sold) == len(set(sold))
+    assert len({bids[w]["carrier_id"] for w in winners}) == len(winners)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_vcg_payments_are_within_the_bids(seed):
+    bids = random_bids(random.Random(seed))
+    welfare, winners = winner_determination(bids, ITEMS)
+    payments = vcg_payments(bids, ITEMS, winners, welfare)
+    assert set(payments) == set(winners)
+    for w in winners:
+        assert 0 <= payments[w] <= bids[w]["value"] + 1e-9
@@ -0,0 +1,77 @@
+import csv
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("ortools")
+
+from models.costModelBasedOnOrder import CostModel
+from models.orderBook import Order, OrderBook
+from models.pickupDelivery import InfeasibleRouteError
+from models.solverConfig import SolverConfig
+
+NODES = [("W0", 0, 0), ("N1", 100, 0), ("N2", 100, 100), ("N3", 5000, 0), ("N4", 5000, 100),
+         ("N5", 400, 0), ("N6", 400, 100), ("N7", 0, 350), ("N8", 100, 350)]
+
+
+def make_cost_model(tmp_path, own_orders):
+    node_file = tmp_path / "nodes.csv"
+    with open(node_file, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Node_ID", "Node_Name", "x", "y"])
+        w.writerows([ID, ID, x, y] for ID, x, y in NODES)
+    books = {"C0": OrderBook(own_orders),
+             "C1": OrderBook([Order("O2", "N3", "N4"), Order("O3", "N2", "N1")])}
+    return CostModel(1.0, 1.4, 2.0, 1.0, "orderC0.csv", "travelMatrixC0.csv",
+                     solver_config=SolverConfig(max_route_distance=1000), carriers_dir=str(tmp_path),
+                     order_book=books["C0"], order_books=books, node_file=str(node_file))
+
+
+@pytest.fixture
+def cost_model(tmp_path):
+    return make_cost_model(tmp_path, [Order("O1", "N1", "N2")])
+
+
+def test_order_beyond_the_distance_limit_is_not_worth_a_bid(cost_model):
+    assert cost_model.profitIfAdded("C1", "N3", "N4") == -1e9
+
+
+def test_order_within_the_limits_is_priced(cost_model):
+    assert cost_model.profitIfAdded("C1", "N2", "N1") > -1e9
+
+
+def test_original_method_name_still_prices(cost_model):
+    assert cost_model.profit_if_added("C1", "N2", "N1") == cost_model.profitIfAdded("C1", "N2", "N1")
+
+
+def test_orders_beyond_the_limits_raise(tmp_path):
+    with pytest.raises(InfeasibleRouteError):
+        make_cost_model(tmp_path, [Order("O1", "N1", "N2"), Order("O4", "N3", "N4")])
+
+
+def test_failed_refresh_keeps_the_previous_solution(tmp_path):
+    model = make_cost_model(tmp_path, [Order("O1", "N1", "N2")])
+    before = model.solution
+    model.order_book.add(Order("O4", "N3", "N4"))
+    orders = model.orders
+    with pytest.raises(InfeasibleRouteError):
+        model.invalidate()
+    assert model.solution is before
+    assert model.orders == orders == [Order("O1", "N1", "N2")]
+
+
+def test_bundles_stay_within_the_limits(tmp_path):
+    model = make_cost_model(tmp_path, [Order("O1", "N1", "N2")])
+    # each order fits the 1000 limit on its own, both together do not;
+    # N3 -> N4 does not fit at all
+    bundles = dict(model.bundleValues([("N5", "N6"), ("N7", "N8"), ("N3", "N4")], max_size=3))
+    assert set(bundles) == {(0,), (1,)}
+
+
+def test_order_is_priced_with_the_orders_already_bid_on(tmp_path):
+    model = make_cost_model(tmp_path, [Order("O1", "N1", "N2")])
+    model.order_books["C1"].add(Order("O5", "N5", "N6"))
+    model.order_books["C1"].add(Order("O6", "N7", "N8"))
+    # either order fits the 1000 limit on its own, not both together
+    assert model.profitIfAdded("C1", "N7", "N8") > -1e9
+    assert model.profitIfAdded("C1", "N7", "N8", pending=[("C1", "N5", "N6")]) == -1e9
@@ -0,0 +1,61 @@
+import json
+import re
+
+import pytest
+
+from models import metrics
+
+
+@pytest.fixture
+def recording():
+    was_enabled = metrics.enabled()
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.reset()
+    if not was_enabled:
+        metrics.disable()
+
+
+@metrics.timed("test.phase")
+def phase(x):
+    return x * 2
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.disable()
+    metrics.reset()
+    phase(1)
+    metrics.count("test.events")
+    assert metrics.snapshot() == {"timers": {}, "counters": {}}
+
+
+def test_prometheus_text_of_a_timed_function(recording):
+    assert phase(2) == 4 and phase(3) == 6
+    metrics.count("test.events", 3)
+    text = metrics.toPrometheus()
+
+    assert "# TYPE ccn_phase_seconds summary" in text
+    assert 'ccn_phase_seconds_count{phase="test.phase"} 2\n' in text
+    total = float(re.search(r'ccn_phase_seconds_sum\{phase="test.phase"\} (\S+)', text).group(1))
+    longest = float(re.search(r'ccn_phase_seconds_max\{phase="test.phase"\} (\S+)', text).group(1))
+    assert 0 <= longest <= total
+    assert 'ccn_events_total{event="test.events"} 3\n' in text
+
+
+def test_timed_function_is_timed_when_it_raises(recording):
+    @metrics.timed("test.failing")
+    def failing():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        failing()
+    assert metrics.snapshot()["timers"]["test.failing"]["count"] == 1
+
+
+def test_json_export(recording, tmp_path):
+    phase(1)
+    path = tmp_path / "_metrics.json"
+    metrics.writeJSON(str(path), {"ticks": 3})
+    data = json.loads(path.read_text())
+    assert data["ticks"] == 3 and data["timers"]["test.phase"]["count"] == 1
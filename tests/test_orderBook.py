@@ -0,0 +1,39 @@
+from models.orderBook import Order, OrderBook
+
+
+def test_rows_keep_insertion_order_and_index_like_csv_rows():
+    book = OrderBook([("O2", "N3", "N4"), ("O1", "N1", "N2", "3")])
+    assert [order.order_pk for order in book.rows()] == ["O2", "O1"]
+    assert book.get("O1")[1:] == ("N1", "N2", 3)
+    assert "O2" in book and len(book) == 2
+
+
+def test_add_and_remove_bump_the_version():
+    book = OrderBook([Order("O1", "N1", "N2")])
+    assert (book.version, book.dirty) == (0, False)
+    book.add(Order("O2", "N3", "N4"))
+    assert book.remove("O1") == Order("O1", "N1", "N2")
+    assert book.remove("O1") is None
+    assert (book.version, book.dirty) == (2, True)
+
+
+def test_find_by_pickup_and_delivery():
+    book = OrderBook([Order("O1", "N1", "N2"), Order("O2", "N1", "N3")])
+    assert book.find("N1", "N3").order_pk == "O2"
+    assert book.find("N2", "N1") is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "orderC0.csv")
+    book = OrderBook([Order("O1", "N1", "N2"), Order("O2", "N3", "N4", 2)], path)
+    book.add(Order("O3", "N5", "N6"))
+    book.save()
+    assert not book.dirty
+    assert OrderBook.load(path).rows() == book.rows()
+
+
+def test_unit_loads_are_saved_without_a_load_column(tmp_path):
+    path = str(tmp_path / "orderC0.csv")
+    OrderBook([Order("O1", "N1", "N2")]).save(path)
+    with open(path) as f:
+        assert f.readline().strip() == "Order ID(pk),pickup,delivery"
@@ -0,0 +1,79 @@
+from models.routeDelta import cheapestInsertion, insertOrder, removalSavings, stopLoads
+
+# nodes on a grid, Manhattan distances keep the expected numbers exact
+POINTS = {"W": (0, 0), "A": (10, 0), "B": (10, 10), "P": (5, 0), "D": (10, 5), "X": (0, 10)}
+
+
+def distance(from_id, to_id):
+    (x1, y1), (x2, y2) = POINTS[from_id], POINTS[to_id]
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+def route_length(route):
+    return sum(distance(a, b) for a, b in zip(route, route[1:]))
+
+
+ROUTES = [["W", "A", "B", "W", "W"]]     # solved routes repeat the end depot
+
+
+def test_cheapest_insertion_matches_the_resulting_route():
+    extra, new_routes = insertOrder(ROUTES, "P", "D", distance, "W")
+    assert new_routes[0] == ["W", "P", "A", "D", "B", "W", "W"]
+    assert extra == route_length(new_routes[0][:-1]) - route_length(ROUTES[0][:-1]) == 0
+
+
+def test_fits_rejects_the_cheapest_insertion():
+    # forbid the pickup directly before the first customer
+    def fits(r, route):
+        return route[route.index("P") + 1] != "A"
+
+    extra, r, k, m = cheapestInsertion(ROUTES, "P", "D", distance, "W", fits)
+    extra_new, new_routes = insertOrder(ROUTES, "P", "D", distance, "W", fits)
+    assert extra == extra_new > 0
+    assert fits(0, new_routes[0])
+    assert extra == route_length(new_routes[0][:-1]) - route_length(ROUTES[0][:-1])
+
+
+def test_no_route_fits():
+    extra, new_routes = insertOrder(ROUTES, "P", "D", distance, "W", lambda r, route: False)
+    assert extra is None
+    assert new_routes == ROUTES
+    assert cheapestInsertion(ROUTES, "P", "D", distance, "W", lambda r, route: False)[0] is None
+
+
+def test_distance_limit_picks_a_route_that_fits():
+    routes = [["W", "A", "B", "W", "W"], ["W", "X", "W", "W"]]
+    cap = route_length(routes[0][:-1])      # the first truck is full
+
+    def fits(r, route):
+        return route_length(route) <= cap
+
+    extra, new_routes = insertOrder(routes, "P", "D", distance, "W", fits)
+    assert extra is not None
+    assert all(route_length(route[:-1]) <= cap for route in new_routes)
+
+
+def test_stop_loads_match_pickups_before_deliveries():
+    route = ["W", "A", "P", "B", "D", "W"]
+    # X is not on the route and must not claim the stop at A
+    loads = stopLoads(route, [("X", "A", 1), ("A", "B", 2), ("P", "D", 3), ("D", "P", 4)])
+    assert loads == [0, 2, 3, -2, -3, 0]
+
+
+def test_removal_savings_match_the_route_without_the_order():
+    route = ["W", "P", "A", "D", "B", "W", "W"]
+    without_pd = ["W", "A", "B", "W"]
+    without_ab = ["W", "P", "D", "W"]
+    savings = removalSavings([route], [("P", "D"), ("A", "B")], distance)
+    assert savings == [route_length(route[:-1]) - route_length(without_pd),
+                       route_length(route[:-1]) - route_length(without_ab)]
+
+
+def test_removal_savings_adjacent_stops_leave_as_one_block():
+    route = ["W", "A", "P", "D", "B", "W", "W"]
+    assert removalSavings([route], [("P", "D")], distance) == [
+        route_length(route[:-1]) - route_length(["W", "A", "B", "W"])]
+
+
+def test_removal_savings_of_an_order_not_on_the_route():
+    assert removalSavings(ROUTES, [("X", "P")], distance) == [0]
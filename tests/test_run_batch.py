@@ -0,0 +1,13 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("mesa")
+pytest.importorskip("ortools")
+
+from auction.run_batch import make_jobs, run_replication
+
+
+def test_seeds_give_different_replications():
+    rows = [run_replication(job) for job in make_jobs(None, ["default"], [0, 1], 10, "single")]
+    assert [row["seed"] for row in rows] == [0, 1]
+    assert rows[0]["profit_after_total"] != rows[1]["profit_after_total"]
@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("ortools")
+pytest.importorskip("mesa")
+
+import models.nodeUtilities as nu
+from auction.core import CarrierModel
+from auction.scenario import Scenario, generateScenario
+from models.orderBook import OrderBook
+from models.pickupDelivery import solve_PnD
+from models.solverConfig import DEFAULT_CONFIG
+
+
+@pytest.mark.parametrize("n_carriers,orders", [(3, 10), (10, 10)])
+def test_generated_books_solve_within_the_distance_limit(tmp_path, n_carriers, orders):
+    scenario = generateScenario(str(tmp_path), n_carriers, orders)
+    node_table = nu.getNodeRegistry(scenario.node_file)
+    for spec in scenario.carriers:
+        book = OrderBook.load(os.path.join(scenario.carriers_dir, spec.order_csv))
+        assert len(book) == orders
+        result = solve_PnD(book.rows(), node_table, spec.depot_id, use_cache=False)
+        assert result is not None and sum(result["distance"]) <= DEFAULT_CONFIG.max_route_distance
+
+
+def test_scenario_file_round_trip(tmp_path):
+    scenario = generateScenario(str(tmp_path), 4, 3)
+    loaded = Scenario.load(str(tmp_path / "scenario.json"))
+    assert loaded.carriers == scenario.carriers
+    assert loaded.node_file == scenario.node_file
+
+
+def test_trading_keeps_routes_within_the_limit(tmp_path):
+    scenario = generateScenario(str(tmp_path), 3, 5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = CarrierModel(transport="inprocess", scenario=scenario, write_snapshots=False,
+                             persist_every=None, seed=1)
+        for _ in range(20):
+            model.step()
+    assert model.trades > 0
+    assert all(sum(c.cost_model.solution["distance"]) <= DEFAULT_CONFIG.max_route_distance
+               for c in model.carriers)
@@ -0,0 +1,114 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("numpy")
+pytest.importorskip("ortools")
+pytest.importorskip("mesa")
+
+import server_for_GUI as server
+from auction.scenario import generateScenario
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def wait_until_done(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = client.get(f"/api/jobs/{job_id}").get_json()
+        if info["status"] in ("finished", "cancelled", "failed"):
+            return info
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.parametrize("body", [
+    {"ticks": "many"},
+    {"ticks": 0},
+    {"delay": "slow"},
+    {"auction_mode": "dutch"},
+    {"scenario": "../../requirements.txt"},
+    {"scenario": "/etc/passwd"},
+    {"scenario": "missing/scenario.json"},
+])
+def test_bad_run_settings_are_rejected(client, body):
+    for url in ("/api/jobs", "/run_one_auction"):
+        response = client.post(url, json=body)
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+
+def test_job_runs_a_scenario_from_the_scenarios_directory(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "PATH_SCENARIOS", str(tmp_path))
+    generateScenario(str(tmp_path / "s3"), 3, 3)
+    response = client.post("/api/jobs", json={"scenario": "s3/scenario.json", "ticks": 2, "delay": 0})
+    assert response.status_code == 202
+    info = wait_until_done(client, response.get_json()["job_id"])
+    assert info["status"] == "finished" and info["carriers"] == 3
+
+
+def test_calculate_route_visits_every_stop(client):
+    response = client.post("/calculate_route", json={
+        "warehouse": {"x": 0, "y": 0},
+        "nodes": [{"id": "N01", "x": 10, "y": 20}, {"id": "N02", "x": 40, "y": 20},
+                  {"id": "N03", "x": 40, "y": -10}]})
+    assert response.status_code == 200
+    result = response.get_json()
+    route = result["route_map_ID"][0]
+    assert route[0] == server.WAREHOUSE_ID and sorted(route[1:4]) == ["N01", "N02", "N03"]
+    assert result["warehouse_location"] == [0, 0]
+
+
+def test_calculate_route_single_stop(client):
+    response = client.post("/calculate_route", json={
+        "warehouse": {"x": 0, "y": 0}, "nodes": [{"id": "N01", "x": 10, "y": 20}]})
+    assert response.status_code == 200
+    assert response.get_json()["route_map_ID"][0][:2] == [server.WAREHOUSE_ID, "N01"]
+
+
+def test_calculate_route_beyond_the_distance_limit(client):
+    response = client.post("/calculate_route", json={
+        "warehouse": {"x": 0, "y": 0}, "nodes": [{"id": "N01", "x": 5000, "y": 0}]})
+    assert response.status_code == 422
+
+
+def test_calculate_route_bad_payload(client):
+    assert client.post("/calculate_route", json={"warehouse": {"x": 0, "y": 0}}).status_code == 400
+    assert client.post("/calculate_route", json={
+        "warehouse": {"x": "west", "y": 0}, "nodes": [{"id": "N01", "x": 1, "y": 1}]}).status_code == 400
+
+
+@pytest.mark.parametrize("last_id", ["", "BOOT-not-a-number", "BOOT-", "someone-else-3"])
+def test_stream_starts_from_a_full_snapshot_without_a_usable_last_event_id(client, monkeypatch, last_id):
+    store = server.SnapshotStore()
+    store.update({"C0": {"distance": [1]}})
+    monkeypatch.setattr(server, "store_for", lambda job_id=None: (store, "BOOT"))
+    response = client.get("/api/carrier_routes/stream", headers={"Last-Event-ID": last_id})
+    assert response.status_code == 200
+    event = next(iter(response.response)).decode()
+    assert event.startswith(f"id: BOOT-{store.version}\nevent: routes\n")
+    data = json.loads(event.split("data: ", 1)[1])
+    assert data["full"] and data["carriers"] == {"C0": {"distance": [1]}}
+    response.close()
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    was_enabled = server.metrics.enabled()
+    server.metrics.enable()
+    try:
+        server.metrics.count("test.events", 2)
+        client.get("/api/jobs")
+        response = client.get("/metrics")
+    finally:
+        if not was_enabled:
+            server.metrics.disable()
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'ccn_events_total{event="test.events"}' in text
+    assert 'ccn_phase_seconds_count{phase="gui/api/jobs"}' in text
@@ -0,0 +1,67 @@
+import json
+
+from auction.snapshot_store import HISTORY, SNAPSHOT_LOG, SnapshotStore
+
+
+def append_log(carriers_dir, tick, carriers, newline=True):
+    with open(carriers_dir / SNAPSHOT_LOG, "a") as f:
+        f.write(json.dumps({"tick": tick, "carriers": carriers}) + ("\n" if newline else ""))
+
+
+def test_changes_since_holds_only_what_changed():
+    store = SnapshotStore()
+    start = store.update({"C0": {"d": 0}, "C1": {"d": 1}})
+    version = store.update({"C1": {"d": 2}})
+    assert version == start + 1
+    changes = store.changes_since(start)
+    assert (changes["version"], changes["full"], changes["carriers"]) == (version, False, {"C1": {"d": 2}})
+    assert store.changes_since(version) is None
+
+
+def test_changes_since_is_full_after_a_reset_or_beyond_the_history():
+    store = SnapshotStore()
+    old = store.update({"C0": {"d": 0}})
+    for d in range(HISTORY):
+        store.update({"C1": {"d": d}})
+    assert not store.changes_since(old)["full"]         # the history still reaches back to old
+    store.update({"C1": {"d": HISTORY}})
+    assert store.changes_since(old)["full"]
+
+    version = store.version
+    store.reset()
+    store.update({"C2": {"d": 0}})
+    changes = store.changes_since(version)
+    assert changes["full"] and changes["carriers"] == {"C2": {"d": 0}}
+
+
+def test_update_without_changes_keeps_the_version():
+    store = SnapshotStore()
+    assert store.update() == store.version
+
+
+def test_refresh_tails_the_log_and_reads_meta_once(tmp_path):
+    (tmp_path / "_carriers.json").write_text(json.dumps({"carriers": ["C0", "C1"]}))
+    append_log(tmp_path, 5, {"C0": {"d": 1}})
+    append_log(tmp_path, 10, {"C1": {"d": 2}}, newline=False)       # still being written
+    store = SnapshotStore(str(tmp_path))
+    version = store.refresh()
+    assert store.state()[1] == [{"d": 1}, {}]
+
+    with open(tmp_path / SNAPSHOT_LOG, "a") as f:
+        f.write("\n")
+    (tmp_path / "_meta.json").write_text(json.dumps({"finished": True}))
+    new_version = store.refresh()
+    assert new_version > version
+    assert store.state()[1:] == ([{"d": 1}, {"d": 2}], {"finished": True})
+    assert set(store.changes_since(version)["carriers"]) == {"C1"}
+    assert store.refresh() == new_version                 # nothing new: same version (the ETag)
+
+
+def test_refresh_starts_over_when_a_new_run_truncates_the_log(tmp_path):
+    append_log(tmp_path, 5, {"C0": {"d": 1}})
+    store = SnapshotStore(str(tmp_path))
+    store.refresh()
+    (tmp_path / SNAPSHOT_LOG).write_text("")
+    version = store.refresh()
+    assert store.changes_since(version - 1)["full"]
+    assert store.state()[1] == []
@@ -0,0 +1,53 @@
+from models.solveCache import SolveCache
+
+ORDERS = [("O1", "N1", "N2"), ("O2", "N3", "N4")]
+RESULT = {"distance": [120], "route_map_ID": [["W0", "N1", "N2", "N3", "N4", "W0", "W0"]]}
+
+
+def test_key_ignores_order_sequence():
+    assert SolveCache.key(ORDERS, "W0", (None,), "v1") == SolveCache.key(ORDERS[::-1], "W0", (None,), "v1")
+
+
+def test_key_depends_on_depot_params_and_version():
+    key = SolveCache.key(ORDERS, "W0", (None,), "v1")
+    assert key != SolveCache.key(ORDERS, "W1", (None,), "v1")
+    assert key != SolveCache.key(ORDERS, "W0", (5.0,), "v1")
+    assert key != SolveCache.key(ORDERS, "W0", (None,), "v2")
+    assert key != SolveCache.key(ORDERS[:1], "W0", (None,), "v1")
+
+
+def test_hits_are_copies():
+    cache = SolveCache()
+    key = SolveCache.key(ORDERS, "W0", (None,), "v1")
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    hit = cache.get(key)
+    hit["distance"].append(1)
+    assert cache.get(key) == RESULT
+    assert cache.stats() == {"size": 1, "hits": 2, "disk_hits": 0, "misses": 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SolveCache(maxsize=2)
+    keys = [SolveCache.key(ORDERS[:1], depot, (None,), "v1") for depot in ("W0", "W1", "W2")]
+    cache.put(keys[0], RESULT)
+    cache.put(keys[1], RESULT)
+    cache.get(keys[0])
+    cache.put(keys[2], RESULT)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == cache.get(keys[2]) == RESULT
+
+
+def test_infeasible_results_are_not_cached():
+    cache = SolveCache()
+    key = SolveCache.key(ORDERS, "W0", (None,), "v1")
+    cache.put(key, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    key = SolveCache.key(ORDERS, "W0", (None,), "v1")
+    SolveCache(disk_dir=str(tmp_path)).put(key, RESULT)
+    fresh = SolveCache(disk_dir=str(tmp_path))
+    assert fresh.get(key) == RESULT
+    assert fresh.stats()["disk_hits"] == 1
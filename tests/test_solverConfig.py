@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("ortools")
+
+from models.node import Node
+from models.pickupDelivery import solve_PnD
+from models.solverConfig import CONSTRAINED_TIME_LIMIT, SolverConfig
+
+POINTS = {"W": (0, 0), "A": (10, 0), "B": (10, 10), "C": (0, 10)}
+
+
+def distance(from_id, to_id):
+    (x1, y1), (x2, y2) = POINTS[from_id], POINTS[to_id]
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+ROUTE = ["W", "A", "B", "C", "W"]       # 40 long
+
+
+def test_route_fits_distance_limit():
+    assert SolverConfig(max_route_distance=40).routeFits(ROUTE, (), distance)
+    assert not SolverConfig(max_route_distance=39).routeFits(ROUTE, (), distance)
+
+
+def test_route_fits_capacity_per_vehicle():
+    loads = [0, 2, 1, -3, 0]
+    config = SolverConfig(num_vehicles=2, vehicle_capacities=[2, 3])
+    assert not config.routeFits(ROUTE, loads, distance, vehicle=0)
+    assert config.routeFits(ROUTE, loads, distance, vehicle=1)
+
+
+def test_route_fits_time_windows():
+    # arrive at A at 10, at B at 25 (5 service at A), leave B at 30 + 5, C at 45
+    config = SolverConfig(time_windows={"B": (30, 40), "C": (0, 45)}, service_time=5)
+    assert config.routeFits(ROUTE, (), distance)                # waits at B until 30
+    late = SolverConfig(time_windows={"C": (0, 34)}, service_time=5)
+    assert not late.routeFits(ROUTE, (), distance)
+
+
+# a depot and six stops on a line, 100 apart; the route is 1200 long
+LINE = {ID: Node(ID, ID, x, 0) for ID, x in [("W0", 0), ("N1", 100), ("N2", 200), ("N3", 300),
+                                                  ("N4", 400), ("N5", 500), ("N6", 600)]}
+LINE_ORDERS = [("O1", "N1", "N2"), ("O2", "N3", "N4"), ("O3", "N5", "N6")]
+
+
+def test_windowed_multi_stop_route_is_feasible():
+    config = SolverConfig(time_windows={"N1": (0, 150), "N4": (300, 450)})
+    result = solve_PnD(LINE_ORDERS, LINE, "W0", use_cache=False, config=config)
+    assert result is not None
+    assert sum(result["distance"]) == 1200
+    route = result["route_map_ID"][0]
+    assert route[1] == "N1" and sorted(route[1:7]) == ["N1", "N2", "N3", "N4", "N5", "N6"]
+
+
+def test_time_windows_are_enforced_per_stop():
+    config = SolverConfig(time_windows={"N6": (0, 100)})
+    assert solve_PnD(LINE_ORDERS, LINE, "W0", use_cache=False, config=config) is None
+
+
+def test_constrained_configs_get_a_finite_time_limit():
+    assert SolverConfig().time_limit is None
+    assert SolverConfig(vehicle_capacities=4).time_limit == CONSTRAINED_TIME_LIMIT
+    assert SolverConfig(time_windows={"N1": (0, 10)}).time_limit == CONSTRAINED_TIME_LIMIT
+    assert SolverConfig(vehicle_capacities=4, time_limit=2.0).time_limit == 2.0
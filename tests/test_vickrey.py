@@ -0,0 +1,77 @@
+import pytest
+
+from auction.network.vickrey import VickreyAuctioneer
+
+
+def open_auction(auctioneer, req_id, seller_id="C0"):
+    auctioneer.start_auction({"req_id": req_id, "seller_id": seller_id, "node_id": "N1",
+                              "delivery": "N2", "order_pk": f"O-{req_id}", "demand": 0, "min_price": 0})
+
+
+def bid(auctioneer, req_id, carrier_id, value):
+    return auctioneer.place_bid({"req_id": req_id, "carrier_id": carrier_id, "value": value})["status"]
+
+
+@pytest.fixture
+def auctioneer():
+    auctioneer = VickreyAuctioneer()
+    open_auction(auctioneer, "R1")
+    return auctioneer
+
+
+def test_higher_bid_pushes_the_best_to_second(auctioneer):
+    bid(auctioneer, "R1", "C1", 10)
+    bid(auctioneer, "R1", "C2", 30)
+    bid(auctioneer, "R1", "C3", 20)
+    result = auctioneer.close_auction("R1")
+    assert (result["winner_id"], result["price"]) == ("C2", 20)
+
+
+def test_lower_bid_replaces_a_lower_second(auctioneer):
+    bid(auctioneer, "R1", "C1", 50)
+    bid(auctioneer, "R1", "C2", 10)
+    bid(auctioneer, "R1", "C3", 25)
+    result = auctioneer.close_auction("R1")
+    assert (result["winner_id"], result["price"]) == ("C1", 25)
+
+
+def test_tie_goes_to_the_earlier_bid_at_the_tied_price(auctioneer):
+    bid(auctioneer, "R1", "C1", 15)
+    bid(auctioneer, "R1", "C2", 15)
+    result = auctioneer.close_auction("R1")
+    assert (result["winner_id"], result["price"]) == ("C1", 15)
+
+
+def test_single_bid_pays_its_own_value(auctioneer):
+    bid(auctioneer, "R1", "C1", 12)
+    assert auctioneer.close_auction("R1")["price"] == 12
+
+
+def test_repeat_bid_from_a_carrier_is_rejected(auctioneer):
+    assert bid(auctioneer, "R1", "C1", 10) == "received"
+    assert bid(auctioneer, "R1", "C1", 99) == "duplicate_bid"
+    bid(auctioneer, "R1", "C2", 5)
+    result = auctioneer.close_auction("R1")
+    assert (result["winner_id"], result["price"]) == ("C1", 5)
+
+
+def test_bid_on_a_closed_auction_is_rejected(auctioneer):
+    auctioneer.close_auction("R1")
+    assert bid(auctioneer, "R1", "C1", 10) == "no_active_auction"
+
+
+def test_open_auctions_close_on_their_own(auctioneer):
+    open_auction(auctioneer, "R2", seller_id="C1")
+    bid(auctioneer, "R1", "C1", 40)
+    bid(auctioneer, "R2", "C0", 7)
+    bid(auctioneer, "R2", "C2", 9)
+    assert [r["req_id"] for r in auctioneer.open_auctions()] == ["R1", "R2"]
+
+    [first] = auctioneer.close_auctions(["R1"])
+    assert (first["req_id"], first["winner_id"], first["price"]) == ("R1", "C1", 40)
+    assert [r["req_id"] for r in auctioneer.open_auctions()] == ["R2"]
+
+    bid(auctioneer, "R2", "C3", 8)
+    [second] = auctioneer.close_auctions()
+    assert (second["req_id"], second["winner_id"], second["price"]) == ("R2", "C2", 8)
+    assert auctioneer.open_auctions() == []